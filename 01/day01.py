@@ -1,38 +1,88 @@
-def parse_file(filename: str) -> list[tuple[int, int]]:
-    result = []
-    with open(filename) as f:
-        for line in f:
-            parts = [x for x in line.strip().split(' ') if x]
-            if len(parts) != 2:
-                print(f'Line: {line!r} not correct length')
-                raise ValueError()
-            result.append((int(parts[0]), int(parts[1])))
-    return result
+import operator
+import os
+import re
+import sys
+from array import array
+from collections import Counter
+from typing import Iterator
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+
+# The usual layout, two fields apart by spaces on every line, checked for a whole chunk in one go
+LINES_PATTERN = re.compile(rb'(?:\S+ +\S+\n)*')
+
+# Bytes read at once. Only whole lines are parsed, so this bounds the memory needed next to the columns.
+CHUNK_SIZE = 1 << 24
+
+
+def read_chunks(filename: str) -> Iterator[bytes]:
+    with open(filename, 'rb') as f:
+        rest = b''
+        while chunk := f.read(CHUNK_SIZE):
+            chunk = rest + chunk
+            end = chunk.rfind(b'\n') + 1
+            rest = chunk[end:]  # a line cut off at the end of the chunk moves to the next one
+            yield chunk[:end]
+        if rest:
+            yield rest + b'\n'
 
-def part1(filename: str) -> int:
-    sample = parse_file(filename)
-    first = [i[0] for i in sample]
-    second = [i[1] for i in sample]
 
-    total_distance = 0
+def read_columns(filename: str) -> Iterator[tuple[array, array]]:
+    # both columns of every chunk of lines as arrays of 64-bit integers
+    for chunk in read_chunks(filename):
+        if not LINES_PATTERN.fullmatch(chunk):
+            # other whitespace is fine too, as long as every line has two fields
+            for line in chunk.splitlines():
+                if len(line.split()) != 2:
+                    print(f'Line: {line.decode()!r} not correct length')
+                    raise ValueError()
+        numbers = chunk.split()
+        yield array('q', map(int, numbers[0::2])), array('q', map(int, numbers[1::2]))
+
+
+@cached_parser
+def parse_file(filename: str) -> tuple[array, array]:
+    first = array('q')
+    second = array('q')
+    for first_chunk, second_chunk in read_columns(filename):
+        first.extend(first_chunk)
+        second.extend(second_chunk)
+    return first, second
+
+
+def part1(filename: str) -> int:
+    first, second = parse_file(filename)
+    # sorted() builds a list of int objects, sorting one column at a time keeps only one of those lists alive
+    first = array('q', sorted(first))
+    second = array('q', sorted(second))
+    return sum(map(abs, map(operator.sub, first, second)))
 
-    for a, b in zip(sorted(first), sorted(second)):
-        distance = abs(a - b)
-        total_distance += distance
 
-    return total_distance
+def similarity_score(first: Counter[int], second: Counter[int]) -> int:
+    # every occurrence of a number in the first list scores the number times its count in the second list
+    return sum(number * count * second[number] for number, count in first.items())
 
 
-def part2(filename: str) -> int:
-    sample = parse_file(filename)
-    first = [i[0] for i in sample]
-    second = [i[1] for i in sample]
-    return sum(i * second.count(i) for i in first)
+def part2(filename: str, stream: bool = False) -> int:
+    if stream:
+        # counts every chunk while reading, memory only grows with the number of distinct numbers
+        first: Counter[int] = Counter()
+        second: Counter[int] = Counter()
+        for first_chunk, second_chunk in read_columns(filename):
+            first.update(first_chunk)
+            second.update(second_chunk)
+    else:
+        first_column, second_column = parse_file(filename)
+        first = Counter(first_column)
+        second = Counter(second_column)
+    return similarity_score(first, second)
 
 
 if __name__ == '__main__':
     assert part1('sample.txt') == 11
     print(part1('input.txt'))
     assert part2('sample.txt') == 31
+    assert part2('sample.txt', stream=True) == 31
     print(part2('input.txt'))
@@ -1,62 +1,132 @@
 import operator
+import os
+import sys
+from typing import Iterable, Iterator
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def parse_input(filename: str) -> list[list[int]]:
+from aoc.cache import cached_parser
+
+# differences between two adjacent levels of a safe report
+INCREASING_STEPS = frozenset((1, 2, 3))
+DECREASING_STEPS = frozenset((-1, -2, -3))
+
+UNSAFE = 0
+TOLERATED = 1
+SAFE = 2
+# bounds the memory of the verdicts per sequence of steps
+MAX_STEP_PATTERNS = 1_000_000
+
+
+def read_reports(filename: str) -> Iterator[list[int]]:
     with open(filename) as f:
-        return [list(map(int, line.split())) for line in f.readlines()]
+        for line in f:
+            yield list(map(int, line.split()))
+
+
+@cached_parser
+def parse_input(filename: str) -> list[list[int]]:
+    return list(read_reports(filename))
+
+
+def is_safe_after_removals(report: list[int], removals: int) -> bool:
+    # One pass over the levels, for increasing and decreasing reports at the same time.
+    # For every level it tracks the fewest levels to remove before it when it is kept. A kept level can only
+    # follow one of the previous removals + 1 levels, otherwise too many levels are removed in between.
+    count = len(report)
+    too_many = removals + 1
+    if count <= too_many:
+        return True  # a single level is left
+    increasing = [too_many] * count
+    decreasing = [too_many] * count
+    last_possible = 0
+    for position, level in enumerate(report):
+        # keeping this level as the first one removes everything before it
+        fewest_increasing = fewest_decreasing = position if position < too_many else too_many
+        skipped = 0
+        for previous_position in range(position - 1, max(position - too_many, 0) - 1, -1):
+            step = level - report[previous_position]
+            if step in INCREASING_STEPS:
+                removed = increasing[previous_position] + skipped
+                if removed < fewest_increasing:
+                    fewest_increasing = removed
+            elif step in DECREASING_STEPS:
+                removed = decreasing[previous_position] + skipped
+                if removed < fewest_decreasing:
+                    fewest_decreasing = removed
+            skipped += 1
+        increasing[position] = fewest_increasing
+        decreasing[position] = fewest_decreasing
+        if fewest_increasing < too_many or fewest_decreasing < too_many:
+            last_possible = position
+        elif position - last_possible >= too_many:
+            return False  # none of the levels a next one could follow can be kept
+    # the levels after the last kept one are removed as well
+    return any(min(increasing[position], decreasing[position]) + count - 1 - position <= removals
+               for position in range(count - too_many, count))
+
+
+def is_safe(report: list[int], removals: int = 0) -> bool:
+    # most reports are safe as they are, the set of steps tells that quicker than the single pass
+    steps = set(map(operator.sub, report[1:], report))
+    if steps <= INCREASING_STEPS or steps <= DECREASING_STEPS:
+        return True
+    return removals > 0 and is_safe_after_removals(report, removals)
 
 
-def report_is_safe(report: list[int]) -> tuple[int, bool]:
-    op = operator.gt if report[0] >= report[1] else operator.lt
-    for idx, (a, b) in enumerate(zip(report, report[1:])):
-        if not op(a, b):
-            # print(f"not safe {a} {op.__name__} {b}")
-            return idx, False
-        if abs(a - b) > 3:
-            # print(f"not safe {a} +- {b} > 3")
-            return idx, False
-    # print(f"safe {report}")
-    return -1, True
+def count_safe(reports: Iterable[list[int]], removals: int) -> tuple[int, int]:
+    # Both parts in one pass: the reports that are safe as they are, and those that are safe after at most
+    # removals. Safety only depends on the steps between the levels, which repeat a lot in a long list of
+    # reports, so every distinct sequence of steps is only checked once.
+    verdicts: dict[tuple[int, ...], int] = {}
+    counts = [0, 0, 0]
+    for report in reports:
+        steps = tuple(map(operator.sub, report[1:], report))
+        verdict = verdicts.get(steps)
+        if verdict is None:
+            if len(verdicts) >= MAX_STEP_PATTERNS:
+                verdicts.clear()
+            if is_safe(report):
+                verdict = SAFE
+            elif removals and is_safe_after_removals(report, removals):
+                verdict = TOLERATED
+            else:
+                verdict = UNSAFE
+            verdicts[steps] = verdict
+        counts[verdict] += 1
+    return counts[SAFE], counts[SAFE] + counts[TOLERATED]
 
 
-def part1(filename: str) -> int:
-    return sum(1 for report in parse_input(filename) if report_is_safe(report)[1])
+def solve_both(filename: str, removals: int = 1) -> tuple[int, int]:
+    # streams the file, for lists of reports that are too big to keep in memory
+    return count_safe(read_reports(filename), removals)
 
 
-def mutate_report(report: list[int], idx) -> list[list[int]]:
-    new_reports = []
-    for i in range(max(idx - 1, 0), min(idx + 1, len(report)) + 1):
-        new_report = list(report)
-        del new_report[i]
-        new_reports.append(new_report)
-    return new_reports
+def part1(filename: str, stream: bool = False) -> int:
+    return count_safe(read_reports(filename) if stream else parse_input(filename), 0)[0]
 
 
-def part2(filename: str) -> int:
-    result = 0
-    for report in parse_input(filename):
-        idx, safe = report_is_safe(report)
-        if safe:
-            result += 1
-            continue
-        for mutated_report in mutate_report(report, idx):
-            if report_is_safe(mutated_report)[1]:
-                result += 1
-                break
-    return result
+def part2(filename: str, stream: bool = False) -> int:
+    # the problem dampener tolerates one bad level
+    return count_safe(read_reports(filename) if stream else parse_input(filename), 1)[1]
 
 
 def main():
-    assert report_is_safe([1, 2])[1]
-    assert report_is_safe([2, 1])[1]
-    assert not report_is_safe([2, 1, 2])[1]
-    assert not report_is_safe([1, 10])[1]
-    assert not report_is_safe([1, 1])[1]
-    assert not report_is_safe([1, 2, 2])[1]
+    assert is_safe([1, 2])
+    assert is_safe([2, 1])
+    assert not is_safe([2, 1, 2])
+    assert not is_safe([1, 10])
+    assert not is_safe([1, 1])
+    assert not is_safe([1, 2, 2])
+    assert is_safe([1, 2, 2], 1)
+    assert is_safe([9, 1, 2, 10, 3], 2)
+    assert not is_safe([9, 1, 2, 10, 3], 1)
     assert part1('sample.txt') == 2
     print(part1('input.txt'))
 
     assert part2('sample.txt') == 4
+    assert part2('sample.txt', stream=True) == 4
+    assert solve_both('sample.txt') == (2, 4)
     print(part2('input.txt'))
 
 
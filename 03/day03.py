@@ -1,36 +1,115 @@
+import mmap
+import os
 import re
+import sys
+from typing import Iterable, Iterator, NamedTuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc import usable_cpus
 
 MUL_PATTERN = re.compile(r'mul\((\d+),(\d+)\)')
-INSTRUCTION_PATTERN = re.compile(r'(do(?:n\'t)?|mul)\((?:(\d+),(\d+))?\)')
+INSTRUCTION_PATTERN = re.compile(rb'(do(?:n\'t)?|mul)\((?:(\d+),(\d+))?\)')
+# The start of an instruction that is cut off at the end of a chunk
+PARTIAL_INSTRUCTION_PATTERN = re.compile(rb'(?:m|mu|d|don|don\'|(?:mul|do|don\'t)(?:\((?:\d+(?:,\d*)?)?)?)\Z')
 
+# The memory is scanned in chunks of this many bytes, which bounds the memory the matches use
+CHUNK_SIZE = 1 << 20
 
-def get_instructions(inp: str) -> list[tuple[str, str, str]]:
-    return INSTRUCTION_PATTERN.findall(inp)
+Instruction = tuple[bytes, bytes | None, bytes | None]
 
 
-def part1(filename: str) -> int:
-    with open(filename) as f:
-        muls = get_instructions(f.read())
-    return sum(int(parts[1]) * int(parts[2]) for parts in muls if parts[0] == 'mul' and muls[1] and muls[2])
+class Segment(NamedTuple):
+    # The sums of a part of the input, for both states it can start in. Until the first do() or don't()
+    # the muls only count when the segment starts enabled, after it the start state no longer matters.
+    before_toggle: int = 0
+    after_toggle: int = 0
+    active: bool | None = None  # the state at the end, None without any do() or don't()
 
 
-def part2(filename: str) -> int:
-    with open(filename) as f:
-        instructions = get_instructions(f.read())
-    result = 0
+def scan_chunk(memory: bytes | mmap.mmap, start: int, end: int) -> Iterator[Instruction]:
+    # Every instruction that starts in memory[start:end]. Instructions can't start inside another one
+    # (only m and d start one, and those don't appear inside an instruction), so chunks can be scanned
+    # on their own, as long as an instruction cut off at the end of the chunk is finished here.
+    last_end = start
+    for match in INSTRUCTION_PATTERN.finditer(memory, start, end):
+        yield match.groups()
+        last_end = match.end()
+    partial = PARTIAL_INSTRUCTION_PATTERN.search(memory, last_end, end)
+    if partial and (match := INSTRUCTION_PATTERN.match(memory, partial.start())):
+        yield match.groups()
+
+
+def read_instructions(filename: str, start: int = 0, end: int | None = None) -> Iterator[Instruction]:
+    # The instructions that start in [start, end) of the file
+    if os.path.getsize(filename) == 0:
+        return  # empty files can't be mapped
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+        end = len(memory) if end is None else min(end, len(memory))
+        for chunk_start in range(start, end, CHUNK_SIZE):
+            yield from scan_chunk(memory, chunk_start, min(chunk_start + CHUNK_SIZE, end))
+
+
+def evaluate(instructions: Iterable[Instruction]) -> Segment:
+    sums = [0, 0]  # before and after the first toggle
+    toggled = False
     active = True
     for instruction in instructions:
         match instruction:
-            case 'do', _, _:
-                active = True
-            case 'don\'t', _, _:
-                active = False
-            case 'mul', a, b:
-                if active:
-                    result += int(a) * int(b)
+            case b'do', _, _:
+                toggled = active = True
+            case b'don\'t', _, _:
+                toggled, active = True, False
+            case b'mul', a, b:
+                if active and a:
+                    sums[toggled] += int(a) * int(b)
+    return Segment(sums[0], sums[1], active if toggled else None)
+
+
+def evaluate_segment(filename: str, start: int, end: int) -> Segment:
+    return evaluate(read_instructions(filename, start, end))
+
+
+def stitch(segments: Iterable[Segment]) -> int:
+    result = 0
+    active = True
+    for segment in segments:
+        if active:
+            result += segment.before_toggle
+        result += segment.after_toggle
+        if segment.active is not None:
+            active = segment.active
     return result
 
 
+def part1(filename: str) -> int:
+    return sum(int(a) * int(b) for name, a, b in read_instructions(filename) if name == b'mul' and a)
+
+
+def part2(filename: str, workers: int = 1) -> int:
+    # more than one worker, or 0 for every CPU, evaluates segments in parallel
+    if workers != 1:
+        return part2_parallel(filename, workers)
+    return stitch([evaluate(read_instructions(filename))])
+
+
+def part2_parallel(filename: str, workers: int | None = None) -> int:
+    # Every worker evaluates a segment of the file, whatever state it starts in, the segments are
+    # stitched together in order afterwards. Segments are at least a chunk, smaller ones aren't worth a process.
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or usable_cpus()
+    size = os.path.getsize(filename)
+    segment_size = max(CHUNK_SIZE, -(-size // workers))
+    starts = range(0, size, segment_size)
+    if len(starts) <= 1:
+        return part2(filename)
+    with ProcessPoolExecutor(len(starts)) as executor:
+        segments = executor.map(evaluate_segment, [filename] * len(starts), starts,
+                                [start + segment_size for start in starts])
+        return stitch(segments)
+
+
 def main():
     assert part1('sample.txt') == 161
     print(part1('input.txt'))
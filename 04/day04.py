@@ -1,7 +1,24 @@
 import enum
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.automaton import AhoCorasick
+from aoc.grid import Grid
+
+
+# Two MAS in the shape of an X, in any of its rotations
+X_MAS = [
+    'M.S',
+    '.A.',
+    'M.S',
+]
 
 
 class Cardinal(enum.Enum):
+    # Same order as Grid.offsets8
     NORTH = 0
     NORTH_EAST = 1
     EAST = 2
@@ -12,130 +29,143 @@ class Cardinal(enum.Enum):
     NORTH_WEST = 7
 
 
-def next_coord(x: int, y: int, cardinal: Cardinal) -> tuple[int, int]:
-    match cardinal:
-        case Cardinal.NORTH:
-            return x, y - 1
-        case Cardinal.NORTH_EAST:
-            return x + 1, y - 1
-        case Cardinal.EAST:
-            return x + 1, y
-        case Cardinal.SOUTH_EAST:
-            return x + 1, y + 1
-        case Cardinal.SOUTH:
-            return x, y + 1
-        case Cardinal.SOUTH_WEST:
-            return x - 1, y + 1
-        case Cardinal.WEST:
-            return x - 1, y
-        case Cardinal.NORTH_WEST:
-            return x - 1, y - 1
-        case _:
-            raise ValueError(f"Unknown cardinal {cardinal.value}")
-
-
-def find_word(matrix: list[list[str]], x: int, y: int, word: str, cardinal: Cardinal) -> bool:
-    if matrix[y][x] != word[0]:
-        return False
-
-    if len(word) == 1:
-        return True  # found last letter
-
-    next_x, next_y = next_coord(x, y, cardinal)
-
-    # detect edge
-    if next_x < 0 or next_x >= len(matrix[y]):
-        return False
-    if next_y < 0 or next_y >= len(matrix):
-        return False
-    return find_word(matrix, next_x, next_y, word[1:], cardinal)
+def find_word(grid: Grid, index: int, word: str, cardinal: Cardinal) -> bool:
+    offset = grid.offsets8[cardinal.value]
+    cells = grid.cells
+    for character in word.encode():
+        # the border around the grid never matches a letter, so this stops before leaving the grid
+        if cells[index] != character:
+            return False
+        index += offset
+    return True
 
 
-def find_all_words(matrix: list[list[str]], x: int, y: int, word: str) -> int:
+def find_all_words(grid: Grid, index: int, word: str) -> int:
     count = 0
     for c in Cardinal:
-        if find_word(matrix, x, y, word, c):
+        if find_word(grid, index, word, c):
             count += 1
     return count
 
 
-def part1(filename: str, search_string: str = 'XMAS') -> int:
-    print(f"Part 1: {filename}")
-    with open(filename) as f:
-        matrix = [[c for c in line.strip()] for line in f]
-
+def count_word(grid: Grid, word: str) -> int:
+    # Reading a line backwards is the same as searching it for the reversed word, so the 8 directions
+    # are 4 directions searched for the word both ways. The lookahead also counts overlapping words.
+    patterns = [re.compile(b'(?=%s)' % re.escape(w.encode())) for w in (word, word[::-1])]
     count = 0
-    for y in range(len(matrix)):
-        for x in range(len(matrix[y])):
-            count += find_all_words(matrix, x, y, search_string)
+    for offset in grid.offsets8[2:6]:  # east, south east, south, south west
+        for _, line in grid.lines(offset):
+            for pattern in patterns:
+                count += len(pattern.findall(line))
     return count
 
 
-def find_xmas_around(matrix: list[list[str]], x: int, y: int) -> bool:
-    if not find_word(matrix, x - 1, y - 1, 'MAS', Cardinal.SOUTH_EAST) \
-            and not find_word(matrix, x - 1, y - 1, 'SAM', Cardinal.SOUTH_EAST):
+def find_words(grid: Grid, words: list[str]) -> dict[str, list[tuple[int, int]]]:
+    # Every occurrence of every word as the index of its first letter and the offset to the next letter.
+    # The words and their reverses go into one automaton, which reads every line in 4 directions once.
+    automaton = AhoCorasick(w.encode() for word in words for w in (word, word[::-1]))
+    # the words a match is, with whether it was found backwards (a palindrome is both)
+    found_as: list[list[tuple[str, bool]]] = [[] for _ in automaton.words]
+    for word in words:
+        found_as[automaton.words.index(word.encode())].append((word, False))
+        found_as[automaton.words.index(word[::-1].encode())].append((word, True))
+    positions: dict[str, list[tuple[int, int]]] = {word: [] for word in words}
+    for offset in grid.offsets8[2:6]:  # east, south east, south, south west
+        for start, line in grid.lines(offset):
+            for position, i in automaton.find(line):
+                index = start + position * offset
+                for word, backwards in found_as[i]:
+                    if backwards:
+                        positions[word].append((index + (len(word) - 1) * offset, -offset))
+                    else:
+                        positions[word].append((index, offset))
+    return positions
+
+
+def count_words(grid: Grid, words: list[str]) -> dict[str, int]:
+    return {word: len(positions) for word, positions in find_words(grid, words).items()}
+
+
+def part1(filename: str, search_string: str = 'XMAS') -> int:
+    print(f"Part 1: {filename}")
+    grid = Grid.from_file(filename)
+    return count_word(grid, search_string)
+
+
+def find_xmas_around(grid: Grid, index: int) -> bool:
+    north_west = index + grid.offsets8[Cardinal.NORTH_WEST.value]
+    north_east = index + grid.offsets8[Cardinal.NORTH_EAST.value]
+    if not find_word(grid, north_west, 'MAS', Cardinal.SOUTH_EAST) \
+            and not find_word(grid, north_west, 'SAM', Cardinal.SOUTH_EAST):
         return False
-    if not find_word(matrix, x + 1, y - 1, 'MAS', Cardinal.SOUTH_WEST) \
-            and not find_word(matrix, x + 1, y - 1, 'SAM', Cardinal.SOUTH_WEST):
+    if not find_word(grid, north_east, 'MAS', Cardinal.SOUTH_WEST) \
+            and not find_word(grid, north_east, 'SAM', Cardinal.SOUTH_WEST):
         return False
     return True
 
 
 def part2(filename: str) -> int:
     print(f"Part 2: {filename}")
-    with open(filename) as f:
-        matrix = [[c for c in line.strip()] for line in f]
-
-    count = 0
-    for y in range(1, len(matrix) - 1):
-        for x in range(1, len(matrix[y]) - 1):
-            if matrix[y][x] == "A":
-                if find_xmas_around(matrix, x, y):
-                    count += 1
-    return count
+    grid = Grid.from_file(filename)
+    return len(grid.find_stencil(X_MAS))
 
 
 def main():
-    assert find_all_words([['X', 'M']], 0, 0, 'XM') == 1
-    assert find_all_words([['M', 'X']], 1, 0, 'XM') == 1
-    assert find_all_words([
-        ['A', 'X'],
-        ['B', 'M']
-    ], 1, 0, 'XM') == 1
-    assert find_all_words([
-        ['A', 'X'],
-        ['M', 'B']
-    ], 1, 0, 'XM') == 1
-    assert find_all_words([
-        ['A', 'M'],
-        ['X', 'B']
-    ], 0, 1, 'XM') == 1
-    assert find_all_words([
-        ['A', 'M'],
-        ['X', 'M']
-    ], 0, 1, 'XM') == 2
+    grid = Grid.from_lines(['XM'])
+    assert find_all_words(grid, grid.index(0, 0), 'XM') == 1
+    grid = Grid.from_lines(['MX'])
+    assert find_all_words(grid, grid.index(1, 0), 'XM') == 1
+    grid = Grid.from_lines([
+        'AX',
+        'BM',
+    ])
+    assert find_all_words(grid, grid.index(1, 0), 'XM') == 1
+    grid = Grid.from_lines([
+        'AX',
+        'MB',
+    ])
+    assert find_all_words(grid, grid.index(1, 0), 'XM') == 1
+    grid = Grid.from_lines([
+        'AM',
+        'XB',
+    ])
+    assert find_all_words(grid, grid.index(0, 1), 'XM') == 1
+    grid = Grid.from_lines([
+        'AM',
+        'XM',
+    ])
+    assert find_all_words(grid, grid.index(0, 1), 'XM') == 2
+    assert count_word(grid, 'XM') == 2
+    assert find_words(grid, ['XM', 'MM']) == {
+        'XM': [(grid.index(0, 1), 1), (grid.index(0, 1), 1 - grid.stride)],
+        'MM': [(grid.index(1, 0), grid.stride), (grid.index(1, 1), -grid.stride)],
+    }
     assert part1('sample.txt') == 18
     print(part1('input.txt'))
-    assert find_xmas_around([
-        ['M', '.', 'M'],
-        ['.', 'A', '.'],
-        ['S', '.', 'S'],
-    ], 1, 1)
-    assert find_xmas_around([
-        ['S', '.', 'S'],
-        ['.', 'A', '.'],
-        ['M', '.', 'M'],
-    ], 1, 1)
-    assert find_xmas_around([
-        ['M', '.', 'S'],
-        ['.', 'A', '.'],
-        ['M', '.', 'S'],
-    ], 1, 1)
-    assert find_xmas_around([
-        ['S', '.', 'M'],
-        ['.', 'A', '.'],
-        ['S', '.', 'M'],
-    ], 1, 1)
+    grid = Grid.from_lines([
+        'M.M',
+        '.A.',
+        'S.S',
+    ])
+    assert find_xmas_around(grid, grid.index(1, 1))
+    grid = Grid.from_lines([
+        'S.S',
+        '.A.',
+        'M.M',
+    ])
+    assert find_xmas_around(grid, grid.index(1, 1))
+    grid = Grid.from_lines([
+        'M.S',
+        '.A.',
+        'M.S',
+    ])
+    assert find_xmas_around(grid, grid.index(1, 1))
+    grid = Grid.from_lines([
+        'S.M',
+        '.A.',
+        'S.M',
+    ])
+    assert find_xmas_around(grid, grid.index(1, 1))
     assert part2('sample.txt') == 9
     print(part2('input.txt'))
 
@@ -1,3 +1,18 @@
+import functools
+import heapq
+import os
+import sys
+from typing import NamedTuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc import usable_cpus
+from aoc.cache import cached_parser
+
+# updates per task when they are checked by a process pool
+BATCH_SIZE = 2000
+
+
 class InputRule:
     def __init__(self, number: int, before: int):
         self.number = number
@@ -7,6 +22,7 @@ class InputRule:
         return f'InputRule[{self.number} before {self.before}]'
 
 
+@cached_parser
 def parse_input(filename: str) -> tuple[list[InputRule], list[list[int]]]:
     rules = []
     updates = []
@@ -23,61 +39,137 @@ def parse_input(filename: str) -> tuple[list[InputRule], list[list[int]]]:
     return rules, updates
 
 
-def find_applicable_rules(rules: list[InputRule], update: list[int]) -> list[InputRule]:
-    return [rule for rule in rules if rule.number in update and rule.before in update]
+# every page with the pages that have to come after it
+RuleIndex = dict[int, set[int]]
 
 
-def update_is_correct(update: list[int], rules: list[InputRule]) -> tuple[bool, int]:
-    applicable_rules = find_applicable_rules(rules, update)
-    for index, page in enumerate(update):
-        for rule in applicable_rules:
-            if rule.number == page:
-                if rule.before in update[:index]:
-                    return False, index
+def index_rules(rules: list[InputRule]) -> RuleIndex:
+    index: RuleIndex = {}
+    for rule in rules:
+        index.setdefault(rule.number, set()).add(rule.before)
+    return index
 
+
+def update_is_correct(update: list[int], rules: RuleIndex) -> tuple[bool, int]:
+    # the first page that has to come before a page already printed
+    printed = set()
+    for index, page in enumerate(update):
+        if not printed.isdisjoint(rules.get(page, ())):
+            return False, index
+        printed.add(page)
     return True, -1
 
 
-def fix_update(update: list[int], rules: list[InputRule]) -> list[int]:
-    applicable_rules = find_applicable_rules(rules, update)
-    current_update = update[:]
-    while True:
-        is_correct, index = update_is_correct(current_update, applicable_rules)
-        if is_correct:
-            break
-        # Move back once at index
-        current_update[index - 1:index + 1] = current_update[index - 1:index + 1][::-1]
+def fix_update(update: list[int], rules: RuleIndex) -> list[int]:
+    # Topological sort of the pages by the rules between them. Of the pages that can go next,
+    # the one that was first in the update goes first, so pages without rules keep their order.
+    pages = set(update)
+    successors = {page: rules.get(page, set()) & pages for page in update}
+    predecessors = dict.fromkeys(update, 0)
+    for after in successors.values():
+        for page in after:
+            predecessors[page] += 1
+    position = {page: i for i, page in enumerate(update)}
+    ready = [(position[page], page) for page, count in predecessors.items() if count == 0]
+    heapq.heapify(ready)
+    fixed = []
+    while ready:
+        _, page = heapq.heappop(ready)
+        fixed.append(page)
+        for after in successors[page]:
+            predecessors[after] -= 1
+            if predecessors[after] == 0:
+                heapq.heappush(ready, (position[after], after))
+    if len(fixed) < len(pages):
+        raise ValueError(f'The rules for {update} contain a cycle')
+    return fixed
+
+
+class CompiledRules(NamedTuple):
+    # Bit p of after[page] is set when page p has to come after page, and the other way around for before
+    after: dict[int, int]
+    before: dict[int, int]
+    index: RuleIndex
+
+
+def compile_rules(rules: list[InputRule]) -> CompiledRules:
+    after: dict[int, int] = {}
+    before: dict[int, int] = {}
+    for rule in rules:
+        after[rule.number] = after.get(rule.number, 0) | 1 << rule.before
+        before[rule.before] = before.get(rule.before, 0) | 1 << rule.number
+    return CompiledRules(after, before, index_rules(rules))
+
+
+def middle_pages(updates: list[list[int]], rules: CompiledRules, fix: bool = True) -> tuple[int, int]:
+    # The sums of the middle pages of the correct updates and of the fixed incorrect ones.
+    # Without fix the incorrect updates are only skipped, and their sum is 0.
+    after = rules.after
+    before = rules.before
+    correct = fixed = 0
+    for update in updates:
+        printed = 0
+        for page in update:
+            if after.get(page, 0) & printed:
+                break
+            printed |= 1 << page
+        else:
+            correct += update[len(update) // 2]
+            continue
+        if not fix:
+            continue
+        # When the rules order every pair of pages, the number of pages in the update that have to
+        # come before a page is its place in the fixed update, so the middle page is found without sorting
+        pages = 0
+        for page in update:
+            pages |= 1 << page
+        middle = len(update) // 2
+        ranked = [page for page in update if (before.get(page, 0) & pages).bit_count() == middle]
+        if len(ranked) == 1 and len(update) * (len(update) - 1) // 2 == sum(
+                (after.get(page, 0) & pages).bit_count() for page in update):
+            fixed += ranked[0]
+        else:
+            fixed += fix_update(update, rules.index)[middle]
+    return correct, fixed
+
+
+def solve_both(filename: str, workers: int = 1, fix: bool = True) -> tuple[int, int]:
+    # Both parts from one parse, part 1 alone without fix. With more than one worker the updates are
+    # checked in batches by a process pool, which only pays off for files with a lot of updates.
+    rules, updates = parse_input(filename)
+    compiled = compile_rules(rules)
+    workers = workers or usable_cpus()
+    if workers <= 1 or len(updates) <= BATCH_SIZE:
+        return middle_pages(updates, compiled, fix)
+    from concurrent.futures import ProcessPoolExecutor
 
-    return current_update
+    batches = [updates[i:i + BATCH_SIZE] for i in range(0, len(updates), BATCH_SIZE)]
+    with ProcessPoolExecutor(min(workers, len(batches))) as executor:
+        sums = list(executor.map(functools.partial(middle_pages, rules=compiled, fix=fix), batches))
+    return sum(correct for correct, _ in sums), sum(fixed for _, fixed in sums)
 
 
 def part1(filename: str) -> int:
-    rules, updates = parse_input(filename)
-    result = 0
-    for update in updates:
-        if update_is_correct(update, rules)[0]:
-            result += update[len(update) // 2]
-    return result
+    return solve_both(filename, fix=False)[0]
 
 
 def part2(filename: str) -> int:
-    rules, updates = parse_input(filename)
-    incorrect = []
-    for update in updates:
-        if not update_is_correct(update, rules)[0]:
-            incorrect.append(update)
-
-    result = 0
-    for update in incorrect:
-        fixed = fix_update(update, rules)
-        result += fixed[len(fixed) // 2]
-    return result
+    return solve_both(filename)[1]
 
 
 def main():
+    rules, updates = parse_input('sample.txt')
+    compiled = compile_rules(rules)
+    for update in updates:
+        # the bitmask check agrees with the plain one on the set of rules
+        correct, fixed = middle_pages([update], compiled)
+        assert bool(correct) == update_is_correct(update, compiled.index)[0]
+        assert fixed == (0 if correct else fix_update(update, compiled.index)[len(update) // 2])
     assert part1('sample.txt') == 143
     print(part1('input.txt'))
     assert part2('sample.txt') == 123
+    assert solve_both('sample.txt', workers=2) == (143, 123)
+    assert solve_both('sample.txt', fix=False) == (143, 0)
     print(part2('input.txt'))
 
 
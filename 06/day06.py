@@ -1,133 +1,235 @@
-import enum
-from dataclasses import dataclass
-
-try:
-    # https://pypi.org/project/tqdm/
-    from tqdm import tqdm
-except ImportError:
-    def tqdm(iterator):
-        return iterator
-
-class Direction(enum.Enum):
-    NORTH = 0
-    EAST = 1
-    SOUTH = 2
-    WEST = 3
-
-    def get_next_direction(self) -> "Direction":
-        new_value = (self.value + 1) % 4
-        return Direction(new_value)
-
-
-@dataclass
-class Point:
-    x: int
-    y: int
-
-
-    def get_next(self, direction: Direction) -> "Point":
-        match direction:
-            case Direction.NORTH:
-                return Point(self.x, self.y - 1)
-            case Direction.EAST:
-                return Point(self.x + 1, self.y)
-            case Direction.SOUTH:
-                return Point(self.x, self.y + 1)
-            case Direction.WEST:
-                return Point(self.x - 1, self.y)
-            case _:
-                raise ValueError("Invalid direction")
-
-    def is_in_bounds(self, max_x: int, max_y: int) -> bool:
-        if self.x < 0 or self.y < 0:
+import os
+import sys
+import time
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc import usable_cpus
+from aoc.cache import cached_parser
+from aoc.grid import EAST, NORTH, OUTSIDE, SOUTH, WEST, Grid
+from aoc.instrument import counted
+from aoc.progress import progress
+
+OBSTACLE = ord('#')
+
+# obstruction tests are handed to the process pool in this many shards per worker
+SHARDS_PER_WORKER = 4
+
+# generations are stored as unsigned 32 bit ints
+MAX_GENERATION = 2 ** 32 - 1
+
+
+class VisitedStates:
+    # The directions the guard turned into at every cell, as a bit per direction (Grid.offsets4 order),
+    # indexed like Grid.cells. A mask only counts when the generation of its cell is the current one,
+    # so starting a new simulation increments a counter instead of clearing or reallocating anything.
+    __slots__ = ('masks', 'generations', 'generation')
+
+    def __init__(self, size: int) -> None:
+        self.masks = bytearray(size)
+        self.generations = array('I', bytes(4 * size))
+        self.generation = 0
+
+    def start(self) -> int:
+        if self.generation == MAX_GENERATION:
+            # cleared in place, callers may hold on to the array
+            self.generations[:] = array('I', bytes(len(self.generations) * 4))
+            self.generation = 0
+        self.generation += 1
+        return self.generation
+
+
+# the map, jump table and visited states of a worker process of part2_parallel
+_worker_grid: Grid | None = None
+_worker_jumps: list[list[int]] = []
+_worker_visited: VisitedStates | None = None
+
+
+@cached_parser
+def parse_input(filename: str) -> tuple[int, Grid]:
+    grid = Grid.from_file(filename)
+    guards = grid.find_all('^')
+    if len(guards) > 1:
+        raise ValueError('Multiple guards')
+    guard = guards[0]
+    grid[guard] = '.'
+    return guard, grid
+
+
+def build_jump_table(grid: Grid) -> list[list[int]]:
+    # For every direction (as in Grid.offsets4) and cell, where the guard stops walking in that direction:
+    # the last cell before an obstacle, or the border cell it leaves the map through.
+    # The cells are filled from the side the guard walks towards, so the next cell is always done already.
+    cells = grid.cells
+    jumps = []
+    for offset in grid.offsets4:
+        stops = list(range(len(cells)))
+        for index in range(len(cells) - 1, -1, -1) if offset > 0 else range(len(cells)):
+            if cells[index] == OUTSIDE or cells[index] == OBSTACLE:
+                continue
+            following = index + offset
+            if cells[following] == OBSTACLE:
+                stops[index] = index
+            elif cells[following] == OUTSIDE:
+                stops[index] = following
+            else:
+                stops[index] = stops[following]
+        jumps.append(stops)
+    return jumps
+
+
+def blocks(grid: Grid, obstacle: int, guard: int, direction: int, stop: int) -> bool:
+    # whether the obstacle is in the way when the guard walks from guard to stop
+    if direction == EAST or direction == WEST:
+        if obstacle // grid.stride != guard // grid.stride:
             return False
-        if self.x > max_x or self.y > max_y:
+    elif obstacle % grid.stride != guard % grid.stride:
+        return False
+    if grid.offsets4[direction] > 0:
+        return guard < obstacle <= stop
+    return stop <= obstacle < guard
+
+
+@counted
+def is_looping(grid: Grid, jumps: list[list[int]], guard: int, direction: int = NORTH,
+               obstacle: int | None = None, visited: VisitedStates | None = None) -> bool:
+    # Jumps from turn to turn, the guard is looping when it turns at the same cell in the same direction twice.
+    # The obstacle is an extra one on top of the jump table, it only changes the jumps that run into it.
+    # Pass visited to reuse it over many simulations.
+    cells = grid.cells
+    offsets = grid.offsets4
+    visited = visited or VisitedStates(len(cells))
+    generation = visited.start()  # before reading the arrays, starting can clear them
+    masks = visited.masks
+    generations = visited.generations
+    while True:
+        stop = jumps[direction][guard]
+        if obstacle is not None and blocks(grid, obstacle, guard, direction, stop):
+            stop = obstacle - offsets[direction]
+        elif cells[stop] == OUTSIDE:
             return False
-        return True
-
-    def __repr__(self):
-        return f"Point({self.x}, {self.y})"
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-
-def parse_file(filename: str) -> tuple[dict[Point, str], tuple[int, int]]:
-    entities: dict[Point, str] = {}
-    max_y = 0
-    max_x = 0
-    with open(filename) as f:
-        for y, line in enumerate(f):
-            max_y = max(max_y, y)
-            for x, character in enumerate(line.strip()):
-                max_x = max(max_x, x)
-                if character in '#^':
-                    entities[Point(x, y)] = character
-    return entities, (max_x, max_y)
-
-
-def parse_input(filename):
-    entities, (max_x, max_y) = parse_file(filename)
-    guard = None
-    for index, value in entities.items():
-        if value == '^':
-            if guard is not None:
-                raise ValueError('Multiple guards')
-            guard = index
-    del entities[guard]
-    objects = list(entities.keys())
-    return guard, max_x, max_y, objects
-
-
-def guard_move(objects: list[Point], position: Point, direction: Direction) -> tuple[Point, Direction]:
-    next_point = position.get_next(direction)
-    new_direction = direction
-    while next_point in objects:
-        new_direction = new_direction.get_next_direction()
-        next_point = position.get_next(new_direction)
-    return next_point, new_direction
-
-
-def get_all_possible_positions(initial_guard: Point, max_x: int, max_y: int, objects: list[Point]) -> set[
-    tuple[Point, Direction]]:
-    direction = Direction.NORTH
-    guard = initial_guard
-    all_known_positions = set()
-    while guard.is_in_bounds(max_x, max_y):
-        # print(f'Guard is at {guard} facing {direction}')
-        if (guard, direction) in all_known_positions:
+        direction = (direction + 1) % 4
+        bit = 1 << direction
+        if generations[stop] != generation:
+            generations[stop] = generation
+            masks[stop] = bit
+        elif masks[stop] & bit:
+            return True
+        else:
+            masks[stop] |= bit
+        guard = stop
+
+
+def first_visits(grid: Grid, jumps: list[list[int]], guard: int) -> dict[int, tuple[int, int]]:
+    # The cells on the route of the guard, in the order they are first visited,
+    # with the cell and direction the guard was in just before (the start is its own)
+    cells = grid.cells
+    offsets = grid.offsets4
+    direction = NORTH
+    visits = {guard: (guard, direction)}
+    turns = set()
+    while True:
+        stop = jumps[direction][guard]
+        offset = offsets[direction]
+        for cell in range(guard + offset, stop + offset, offset):
+            if cell not in visits:
+                visits[cell] = (cell - offset, direction)
+        if cells[stop] == OUTSIDE:
+            del visits[stop]
+            return visits
+        direction = (direction + 1) % 4
+        turn = stop * 4 + direction
+        if turn in turns:
             raise ValueError('Guard is looping')
-        all_known_positions.add((guard, direction))
-        guard, direction = guard_move(objects, guard, direction)
-        # print(f'Next position is {guard}')
-    return all_known_positions
+        turns.add(turn)
+        guard = stop
 
 
 def part1(filename: str) -> int:
-    guard, max_x, max_y, objects = parse_input(filename)
+    guard, grid = parse_input(filename)
+    return len(first_visits(grid, build_jump_table(grid), guard))
+
+
+def part2(filename: str, workers: int = 1) -> int:
+    if workers != 1:
+        return part2_parallel(filename, workers)
+    guard, grid = parse_input(filename)
+    jumps = build_jump_table(grid)
+    visited = VisitedStates(len(grid.cells))
+
+    loops = 0
+    for point, (previous, direction) in progress(first_visits(grid, jumps, guard).items()):
+        # An obstruction only changes the route from where the guard would first walk into it,
+        # so the guard starts just before it instead of at the start of the route
+        if is_looping(grid, jumps, previous, direction, point, visited):
+            loops += 1
+    return loops
+
+
+def init_worker(name: str, width: int, height: int) -> None:
+    # The map comes from shared memory, every worker builds its own jump table from it
+    from multiprocessing import shared_memory
+
+    global _worker_grid, _worker_jumps, _worker_visited
+    grid = Grid(width, height)
+    shared = shared_memory.SharedMemory(name)
+    try:
+        grid.cells[:] = shared.buf[:len(grid.cells)]
+    finally:
+        shared.close()
+    _worker_grid = grid
+    _worker_jumps = build_jump_table(grid)
+    _worker_visited = VisitedStates(len(grid.cells))
+
 
-    all_possible_positions = get_all_possible_positions(guard, max_x, max_y, objects)
-    return len(set(v[0] for v in all_possible_positions))
+def count_loops(obstructions: array) -> tuple[int, int, int, float]:
+    # obstructions holds (point, previous cell, direction) triples,
+    # returns the process, the number tested, the number that loop and the time it took
+    start = time.perf_counter()
+    loops = 0
+    for i in range(0, len(obstructions), 3):
+        point, previous, direction = obstructions[i:i + 3]
+        if is_looping(_worker_grid, _worker_jumps, previous, direction, point, _worker_visited):
+            loops += 1
+    return os.getpid(), len(obstructions) // 3, loops, time.perf_counter() - start
 
 
-def part2(filename: str) -> int:
-    guard, max_x, max_y, objects = parse_input(filename)
+def part2_parallel(filename: str, workers: int | None = None) -> int:
+    # The obstructions are tested in shards by a process pool, which report how fast every worker went
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import shared_memory
 
-    all_known_positions = get_all_possible_positions(guard, max_x, max_y, objects)
-    all_known_points = set(position[0] for position in all_known_positions)
+    guard, grid = parse_input(filename)
+    workers = workers or usable_cpus()
+    visits = first_visits(grid, build_jump_table(grid), guard)
+    # dealt round-robin, the obstructions late on the route (the longest to test) are spread over the shards
+    shards = [array('q') for _ in range(min(workers * SHARDS_PER_WORKER, len(visits)))]
+    for i, (point, (previous, direction)) in enumerate(visits.items()):
+        shards[i % len(shards)].extend((point, previous, direction))
 
-    loops = set()
-    for point in tqdm(all_known_points):
-        try:
-            # optimization idea: start at the position just before the obstacle.
-            # The loop will only deviate from the base route from the obstacle onwards, so the rest of the route doesn't matter.
-            # Unfortunate the previous position and direction are not available right now.
-            # They also can't be calculated as the guard might turn twice in one move
-            get_all_possible_positions(guard, max_x, max_y, [*objects, point])
-        except ValueError:
-            loops.add(point)
+    shared = shared_memory.SharedMemory(create=True, size=len(grid.cells))
+    try:
+        shared.buf[:len(grid.cells)] = grid.cells
+        with ProcessPoolExecutor(workers, initializer=init_worker,
+                                 initargs=(shared.name, grid.width, grid.height)) as executor:
+            futures = [executor.submit(count_loops, shard) for shard in shards]
+            loops = 0
+            throughput: dict[int, list[float]] = {}
+            for future in progress(as_completed(futures), total=len(futures)):
+                pid, tested, found, seconds = future.result()
+                loops += found
+                totals = throughput.setdefault(pid, [0, 0.0])
+                totals[0] += tested
+                totals[1] += seconds
+    finally:
+        shared.close()
+        shared.unlink()
 
-    return len(loops)
+    for pid, (tested, seconds) in sorted(throughput.items()):
+        rate = tested / seconds if seconds else 0
+        print(f'Worker {pid}: {tested} obstructions in {seconds:.2f}s, {rate:.0f}/s', file=sys.stderr)
+    return loops
 
 
 def main():
@@ -136,11 +238,18 @@ def main():
     # #.
     # ^#
     # *.  * is expected
-    assert guard_move([
-        Point(0, 0),
-        Point(1, 1),
-    ], Point(0, 1), Direction.NORTH) == (Point(0, 2), Direction.SOUTH)
+    grid = Grid.from_lines([
+        '#.',
+        '.#',
+        '..',
+    ])
+    guard = grid.index(0, 1)
+    jumps = build_jump_table(grid)
+    assert jumps[NORTH][guard] == jumps[EAST][guard] == guard
+    assert first_visits(grid, jumps, guard) == {guard: (guard, NORTH), grid.index(0, 2): (guard, SOUTH)}
+    assert not is_looping(grid, jumps, guard)
     assert part2('sample.txt') == 6, print(part2('sample.txt'))
+    assert part2('sample.txt', workers=2) == 6
     print(part2('input.txt'))
 
 
@@ -1,13 +1,14 @@
 import math
 import operator
+import os
+import sys
 from dataclasses import dataclass
 from typing import Generator
 
-try:
-    from tqdm import tqdm
-except ImportError:
-    def tqdm(iterable):
-        return iterable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+from aoc.progress import progress
 
 operators = [
     operator.add,
@@ -40,6 +41,7 @@ class Record:
     values: list[int]
 
 
+@cached_parser
 def parse_input(filename: str) -> list[Record]:
     records = []
     with open(filename) as inp:
@@ -63,7 +65,7 @@ def get_possible_values(values: list[int], ops) -> Generator[int, None, None]:
 def part1(filename: str) -> int:
     records = parse_input(filename)
     valid_records = []
-    for record in tqdm(records):
+    for record in progress(records):
         for possible_value in get_possible_values(record.values, operators):
             if possible_value == record.expected:
                 valid_records.append(record)
@@ -74,7 +76,7 @@ def part1(filename: str) -> int:
 def part2(filename: str) -> int:
     records = parse_input(filename)
     valid_records = []
-    for record in tqdm(records):
+    for record in progress(records):
         for possible_value in get_possible_values(record.values, operators2):
             if possible_value == record.expected:
                 valid_records.append(record)
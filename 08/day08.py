@@ -1,6 +1,12 @@
+import os
+import sys
 from dataclasses import dataclass
 from itertools import groupby, combinations
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+
 
 @dataclass
 class Antenna:
@@ -9,6 +15,7 @@ class Antenna:
     frequency: str
 
 
+@cached_parser
 def parse_input(filename: str) -> tuple[int, int, list[Antenna]]:
     antennas = []
     max_x = 0
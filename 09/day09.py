@@ -1,6 +1,12 @@
 import enum
+import os
+import sys
 from dataclasses import dataclass
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+
 
 class BlockType(enum.Enum):
     USED = 0
@@ -17,6 +23,7 @@ class Block:
     moved: bool = False
 
 
+@cached_parser
 def parse_input(filename: str) -> list[Block]:
     blocks = []
     current = BlockType.USED
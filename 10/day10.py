@@ -1,59 +1,46 @@
-from pprint import pprint
-from typing import Generator
+import os
+import sys
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def parse_input(filename: str) -> list[list[int]]:
-    data = []
-    with open(filename) as f:
-        for line in f:
-            data.append(list(map(int, line.strip())))
-    return data
+from aoc.cache import cached_parser
+from aoc.grid import Grid
 
+TRAIL_END = ord('9')
 
-def next_coords(x: int, y: int, max_x: int, max_y) -> Generator[tuple[int, int], None, None]:
-    if x > 0:
-        yield x - 1, y
-    if y > 0:
-        yield x, y - 1
-    if x < max_x - 1:
-        yield x + 1, y
-    if y < (max_y - 1):
-        yield x, y + 1
 
+@cached_parser
+def parse_input(filename: str) -> Grid:
+    return Grid.from_file(filename)
 
-def print_route(route: list[tuple[int, int]], max_x: int, max_y: int) -> None:
-    trail_map: list[list[str]] = [
-        ['.' for _ in range(max_x)]
-        for _ in range(max_y)
-    ]
 
-    for idx, (x, y) in enumerate(route):
-        trail_map[y][x] = str(idx)
+def print_route(trail_map: Grid, route: list[int]) -> None:
+    route_map = Grid(trail_map.width, trail_map.height)
+    for idx, index in enumerate(route):
+        route_map[index] = str(idx)
 
-    pprint(route)
-    print('\n'.join(''.join(line) for line in trail_map))
+    print([trail_map.coords(index) for index in route])
+    print(route_map)
 
 
-def walk_trail(trail_map: list[list[int]], x: int, y: int) -> list[list[tuple[int, int]]]:
-    current_value = trail_map[y][x]
-    if current_value == 9:
-        return [[(x, y)]]
+def walk_trail(trail_map: Grid, index: int) -> list[list[int]]:
+    current_value = trail_map.cells[index]
+    if current_value == TRAIL_END:
+        return [[index]]
     next_value = current_value + 1
     routes = []
-    for next_x, next_y in next_coords(x, y, len(trail_map[0]), len(trail_map)):
-        if trail_map[next_y][next_x] == next_value:
-            for route in walk_trail(trail_map, next_x, next_y):
-                routes.append([(x, y)] + route)
+    for next_index in trail_map.neighbours(index):
+        if trail_map.cells[next_index] == next_value:
+            for route in walk_trail(trail_map, next_index):
+                routes.append([index] + route)
     return routes
 
 
 def get_trails_in_map(filename):
-    data = parse_input(filename)
+    trail_map = parse_input(filename)
     trails = []
-    for y, line in enumerate(data):
-        for x, value in enumerate(line):
-            if value == 0:
-                trails.append(walk_trail(data, x, y))
+    for index in trail_map.find_all('0'):
+        trails.append(walk_trail(trail_map, index))
     return trails
 
 
@@ -1,11 +1,10 @@
-import timeit
+import os
+import sys
 from functools import cache
 
-try:
-    from tqdm import tqdm
-except ImportError:
-    def tqdm(x):
-        return x
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.instrument import track_cache
 
 
 def parse_input(filename: str) -> list[int]:
@@ -13,6 +12,7 @@ def parse_input(filename: str) -> list[int]:
         return list(map(int, f.readline().strip().split(' ')))
 
 
+@track_cache
 @cache
 def stone_blink(stone: int) -> list[int]:
     if stone == 0:
@@ -42,6 +42,7 @@ def part1a(filename: str) -> int:
 
 
 # The solution to part 2 was cache :sweat_smile:
+@track_cache
 @cache
 def blink_depth(stone: int, depth: int) -> int:
     next_stones = stone_blink(stone)
@@ -74,10 +75,6 @@ def main():
     assert blink([253000, 1, 7]) == [253, 0, 2024, 14168]
     assert part1a('sample2.txt') == 55312, part1a('sample2.txt')
     assert part1b('sample2.txt') == 55312, part1b('sample2.txt')
-    time_part1a = timeit.timeit(lambda: part1a('sample2.txt'), number=100)
-    print(f'Part 1a took {time_part1a} seconds on average')
-    time_part1b = timeit.timeit(lambda: part1b('sample2.txt'), number=100)
-    print(f'Part 1b took {time_part1b} seconds on average')
     print('Part 1: ', part1b('input.txt'))
     print('Part 2: ', part2('input.txt'))
     print(stone_blink.cache_info())
@@ -1,22 +1,27 @@
-from dataclasses import dataclass
-from typing import Optional
+import os
+import sys
+from dataclasses import dataclass, field
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-@dataclass
-class Region:
-    fields: list["Field"]
+from aoc.cache import cached_parser
+from aoc.grid import Grid, NORTH, EAST, SOUTH, WEST
 
-    def __init__(self):
-        self.fields = []
 
-    def __hash__(self):
-        return id(self)
+@dataclass
+class Region:
+    character: str
+    grid: Grid = field(repr=False)
+    fields: set[int] = field(default_factory=set)
 
     def area(self) -> int:
         return len(self.fields)
 
     def perimeter(self) -> int:
-        return sum(4 - len(field.neighbours()) for field in self.fields)
+        return sum(1
+                   for index in self.fields
+                   for offset in self.grid.offsets4
+                   if index + offset not in self.fields)
 
     def calculate_price(self) -> int:
         return self.area() * self.perimeter()
@@ -25,129 +30,55 @@ class Region:
         return self.area() * self.no_faces()
 
     def no_faces(self) -> int:
+        offsets = self.grid.offsets4
         return sum([
-            self.no_faces_direction((0, 1), (-1, 0), (1, 0)),
-            self.no_faces_direction((0, -1), (-1, 0), (1, 0)),
-            self.no_faces_direction((1, 0), (0, -1), (0, 1)),
-            self.no_faces_direction((-1, 0), (0, -1), (0, 1)),
+            self.no_faces_direction(offsets[SOUTH], offsets[WEST]),
+            self.no_faces_direction(offsets[NORTH], offsets[WEST]),
+            self.no_faces_direction(offsets[EAST], offsets[NORTH]),
+            self.no_faces_direction(offsets[WEST], offsets[NORTH]),
         ])
 
-    def no_faces_direction(self,
-                           break_direction: tuple[int, int],
-                           negative_direction: tuple[int, int],
-                           positive_direction: tuple[int, int]) -> int:
-        faces: list[list[Field]] = []
-        fields_already_in_face: set[Field] = set()
-        for field in self.fields:
-            if field in fields_already_in_face:
-                continue
-            face = field.faces_in_plane(break_direction, negative_direction, positive_direction)
-            if len(face) == 0:
-                # this field is not part of a plane
+    def no_faces_direction(self, break_offset: int, along_offset: int) -> int:
+        # A field is part of a face when its neighbour in the break direction isn't in the region.
+        # Every face is counted once, at the field where it starts.
+        faces = 0
+        for index in self.fields:
+            if index + break_offset in self.fields:
                 continue
-            faces.append(list(face))
-            fields_already_in_face.update(face)
-        return len(faces)
-
-
-@dataclass
-class Field:
-    character: str
-    x: int
-    y: int
-    region: Region = None
-
-    def set_region(self, region: Region):
-        if region is self.region:
-            return
-        if self.region:
-            region = merge_regions(self.region, region)
-        self.region = region
-        self.register_self()
-
-    def new_region(self):
-        self.region = Region()
-        self.register_self()
-
-    def register_self(self):
-        if self not in self.region.fields:
-            self.region.fields.append(self)
-
-    def faces_in_plane(self,
-                       break_direction: tuple[int, int],
-                       negative_direction: tuple[int, int],
-                       positive_direction: tuple[int, int]) -> set["Field"]:
-        faces = set()
-        current = self
-        while current and not current.neighbour_in_direction(*break_direction):
-            faces.add(current)
-            current = current.neighbour_in_direction(*negative_direction)
-        current = self
-        while current and not current.neighbour_in_direction(*break_direction):
-            faces.add(current)
-            current = current.neighbour_in_direction(*positive_direction)
+            previous = index + along_offset
+            if previous in self.fields and previous + break_offset not in self.fields:
+                continue  # the face already started at the previous field
+            faces += 1
         return faces
 
-    def neighbour_in_direction(self, x: int, y: int) -> Optional["Field"]:
-        for field in self.region.fields:
-            if field.x == self.x + x and field.y == self.y + y:
-                return field
-        return None
-
-    def neighbours(self) -> list["Field"]:
-        neighbours: set["Field"] = set()
-        for x in range(-1, 2, 2):
-            neighbour = self.neighbour_in_direction(x, 0)
-            if neighbour:
-                neighbours.add(neighbour)
-        for y in range(-1, 2, 2):
-            neighbour = self.neighbour_in_direction(0, y)
-            if neighbour:
-                neighbours.add(neighbour)
-
-        return list(neighbours)
-
-    def __hash__(self):
-        return id(self)
-
-
-def merge_regions(region_a: Region, region_b: Region) -> Region:
-    all_fields = region_a.fields + region_b.fields
-    new_region = Region()
-    new_region.fields = all_fields
-    for field in all_fields:
-        field.region = new_region
-    return new_region
-
-
-def parse_input(filename: str) -> list[list[Field]]:
-    data = []
-    with open(filename) as f:
-        for y, line in enumerate(f):
-            data_line = []
-            data.append(data_line)
-            for x, c in enumerate(line.strip()):
-                data_line.append(Field(c, x, y))
-    return data
+
+@cached_parser
+def parse_input(filename: str) -> Grid:
+    return Grid.from_file(filename)
 
 
 def get_regions(filename) -> list[Region]:
-    data = parse_input(filename)
-    for y, line in enumerate(data):
-        for x, field in enumerate(line):
-            if x > 0:
-                if line[x - 1].character == field.character:
-                    field.set_region(line[x - 1].region)
-            if y > 0:
-                if data[y - 1][x].character == field.character:
-                    field.set_region(data[y - 1][x].region)
-            if field.region is None:
-                field.new_region()
-    regions = set()
-    for line in data:
-        for field in line:
-            regions.add(field.region)
-    return list(regions)
+    grid = parse_input(filename)
+    cells = grid.cells
+    seen: set[int] = set()
+    regions = []
+    for start in grid.positions():
+        if start in seen:
+            continue
+        region = Region(grid[start], grid)
+        character = cells[start]
+        stack = [start]
+        seen.add(start)
+        while stack:
+            index = stack.pop()
+            region.fields.add(index)
+            for offset in grid.offsets4:
+                neighbour = index + offset
+                if cells[neighbour] == character and neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        regions.append(region)
+    return regions
 
 
 def part1(filename: str) -> int:
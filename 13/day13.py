@@ -1,7 +1,13 @@
 import math
+import os
 import re
+import sys
 from dataclasses import dataclass
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+
 RE_BUTTON = re.compile(r"Button [AB]: X([+-]\d+), Y([+-]\d+)")
 RE_PRIZE = re.compile(r"Prize: X=(\d+), Y=(\d+)")
 
@@ -13,6 +19,7 @@ class Machine:
     prize: tuple[int, int]
 
 
+@cached_parser
 def parse_input(filename) -> list[Machine]:
     machines = []
     with open(filename) as f:
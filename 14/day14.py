@@ -1,13 +1,14 @@
 import math
+import os
 import re
+import sys
 from dataclasses import dataclass
 from enum import Enum
 from typing import IO
 
-try:
-    from PIL import Image
-except ImportError:
-    print('Missing pillow, part 2 will not work')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
 
 RE_ROBOT = re.compile(r'p=(\d+,\d+) v=(-?\d+,-?\d+)')
 
@@ -49,6 +50,7 @@ class Robot:
         return None
 
 
+@cached_parser
 def parse_input(filename) -> list[Robot]:
     robots = []
     with open(filename) as f:
@@ -62,6 +64,8 @@ def parse_input(filename) -> list[Robot]:
 
 
 def draw_field(filename: str, robots: list[Robot], field_width: int, field_height: int):
+    from PIL import Image
+
     robots_per_coord: dict[tuple[int, int], int] = {}
     for robot in robots:
         if robot.position not in robots_per_coord:
@@ -1,5 +1,11 @@
+import os
+import sys
 from dataclasses import dataclass
-from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+from aoc.grid import Grid, NORTH, EAST, SOUTH, WEST
 
 VERTICAL_MOVES = [
     '^',
@@ -7,175 +13,128 @@ VERTICAL_MOVES = [
     'V',
 ]
 
+MOVE_DIRECTIONS = {
+    '^': NORTH,
+    '>': EAST,
+    'v': SOUTH,
+    'V': SOUTH,
+    '<': WEST,
+}
 
-@dataclass
-class WarehouseObject:
-    x: int
-    y: int
-    width: int
-
-    def occupies(self, x: int, y: int) -> bool:
-        if self.width == 1:
-            return self.x == x and self.y == y
-        elif self.width == 2:
-            return (self.x == x or self.x + 1 == x) and self.y == y
-
-
-    def get_gps(self) -> int:
-        return self.x + self.y * 100
-
-    def get_next_coords(self, direction: str) -> tuple[int, int]:
-        match direction:
-            case "<":
-                return self.x - 1, self.y
-            case ">":
-                return self.x + 1, self.y
-            case "V" | 'v':
-                return self.x, self.y + 1
-            case "^":
-                return self.x, self.y - 1
-            case _:
-                raise ValueError(f"Invalid direction {direction}")
-
-
-@dataclass
-class Robot(WarehouseObject):
-    pass
-
+WALL = ord('#')
+BOX = ord('O')
+BOX_LEFT = ord('[')
+BOX_RIGHT = ord(']')
+EMPTY = ord('.')
 
-@dataclass
-class Box(WarehouseObject):
-    pass
-
-
-@dataclass
-class Wall(WarehouseObject):
-    pass
+WIDE_TILES = {
+    '#': '##',
+    'O': '[]',
+    '@': '@.',
+    '.': '..',
+}
 
 
 @dataclass
 class Warehouse:
-    walls: List[Wall]
-    boxes: List[Box]
-    robots: List[Robot]
+    grid: Grid
+    robot: int
     moves: list[str]
     move_index: int = 0
 
-    def get_object_at(self, x: int, y: int) -> WarehouseObject | None:
-        for wall in self.walls:
-            if wall.occupies(x, y):
-                return wall
-        for box in self.boxes:
-            if box.occupies(x, y):
-                return box
-        for robot in self.robots:
-            if robot.occupies(x, y):
-                return robot
-        return None
-
-    def can_move_one(self, warehouse_object: WarehouseObject, direction: str) -> bool:
-        next_x, next_y = warehouse_object.get_next_coords(direction)
-        for i in range(warehouse_object.width):
-            object_in_way = self.get_object_at(next_x + i, next_y)
-            if object_in_way is warehouse_object:
-                continue
-            if object_in_way:
-                if isinstance(object_in_way, Wall):
-                    return False
-                if not self.can_move_one(object_in_way, direction):
-                    return False
-        return True
-
-    def do_move_one(self, warehouse_object: WarehouseObject, direction: str):
-        next_x, next_y = warehouse_object.get_next_coords(direction)
-        for i in range(warehouse_object.width):
-            object_in_way = self.get_object_at(next_x + i, next_y)
-            if object_in_way is warehouse_object:
+    def get_cells_to_move(self, index: int, move: str) -> list[int] | None:
+        # All cells that move along when index moves, None when something runs into a wall
+        offset = self.grid.offsets4[MOVE_DIRECTIONS[move]]
+        vertical = move in VERTICAL_MOVES
+        cells = self.grid.cells
+        to_move = [index]
+        seen = {index}
+        for current in to_move:
+            next_index = current + offset
+            next_cell = cells[next_index]
+            if next_cell == WALL:
+                return None
+            if next_cell == EMPTY:
                 continue
-            if object_in_way:
-                if isinstance(object_in_way, Wall):
-                    raise ValueError('Not expected, wall in way')
-                self.do_move_one(object_in_way, direction)
-        warehouse_object.x = next_x
-        warehouse_object.y = next_y
+            pushed = [next_index]
+            if vertical and next_cell == BOX_LEFT:
+                pushed.append(next_index + 1)
+            elif vertical and next_cell == BOX_RIGHT:
+                pushed.append(next_index - 1)
+            for push in pushed:
+                if push not in seen:
+                    seen.add(push)
+                    to_move.append(push)
+        return to_move
 
     def do_move(self):
         move = self.moves[self.move_index]
         self.move_index += 1
 
-        for robot in self.robots:
-            if self.can_move_one(robot, move):
-                self.do_move_one(robot, move)
+        to_move = self.get_cells_to_move(self.robot, move)
+        if to_move is None:
+            return
+        offset = self.grid.offsets4[MOVE_DIRECTIONS[move]]
+        cells = self.grid.cells
+        # Move the cells furthest in the direction of the move first, so nothing gets overwritten
+        for index in sorted(to_move, reverse=offset > 0):
+            cells[index + offset] = cells[index]
+            cells[index] = EMPTY
+        self.robot += offset
 
-        # for warehouse_object in [*self.walls, *self.boxes, *self.robots]:
-        #     if self.get_object_at(warehouse_object.x, warehouse_object.y) is not warehouse_object:
-        #         raise ValueError
+    def get_gps(self) -> int:
+        total = 0
+        for index in self.grid.positions():
+            if self.grid.cells[index] in (BOX, BOX_LEFT):
+                x, y = self.grid.coords(index)
+                total += x + y * 100
+        return total
 
     def stringify_field(self) -> str:
-        width = max(*[wall.x for wall in self.walls]) + self.walls[0].width
-        height = max(*[wall.y for wall in self.walls]) + 1
-        fields = [['.'] * width for _ in range(height)]
-        for wall in self.walls:
-            for i in range(wall.width):
-                fields[wall.y][wall.x + i] = '#'
-        for box in self.boxes:
-            if box.width == 1:
-                fields[box.y][box.x] = 'O'
-            elif box.width == 2:
-                fields[box.y][box.x] = '['
-                fields[box.y][box.x + 1] = ']'
-            else:
-                raise ValueError('thicc box')
-        for robot in self.robots:
-            fields[robot.y][robot.x] = '@'
-        return '\n'.join(''.join(field) for field in fields)
+        return str(self.grid)
 
 
+@cached_parser
 def parse_input(filename: str, object_width: int) -> Warehouse:
-    walls = []
-    boxes = []
-    robots = []
+    lines = []
     moves = []
     with open(filename) as f:
-        for y, line in enumerate(f):
+        for line in f:
             if not line.strip():
                 break  # blank line, now continuing with moves
-            for x, c in enumerate(line.strip()):
-                if c == "#":
-                    walls.append(Wall(x * object_width, y, object_width))
-                elif c == "O":
-                    boxes.append(Box(x * object_width, y, object_width))
-                elif c == '@':
-                    robots.append(Robot(x * object_width, y, 1))
-                elif c == '.':
-                    continue
-                else:
+            row = []
+            for c in line.strip():
+                if c not in WIDE_TILES:
                     print(f'Unknown character {c!r}')
+                    c = '.'
+                row.append(WIDE_TILES[c] if object_width == 2 else c)
+            lines.append(''.join(row))
         for line in f:
             moves.extend(line.strip())
-    return Warehouse(walls, boxes, robots, moves)
+    grid = Grid.from_lines(lines)
+    robots = grid.find_all('@')
+    assert len(robots) == 1
+    return Warehouse(grid, robots[0], moves)
 
 
 def part1(filename: str) -> int:
     warehouse = parse_input(filename, 1)
-    assert len(warehouse.robots) == 1
     while warehouse.move_index < len(warehouse.moves):
         warehouse.do_move()
 
     print(warehouse.stringify_field())
 
-    return sum(box.get_gps() for box in warehouse.boxes)
+    return warehouse.get_gps()
 
 
 def part2(filename: str) -> int:
     warehouse = parse_input(filename, 2)
-    assert len(warehouse.robots) == 1
     while warehouse.move_index < len(warehouse.moves):
         warehouse.do_move()
 
     print(warehouse.stringify_field())
 
-    return sum(box.get_gps() for box in warehouse.boxes)
+    return warehouse.get_gps()
 
 
 def main():
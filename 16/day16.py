@@ -1,53 +1,84 @@
-import copy
-from timeit import timeit
+import os
+import sys
+from typing import Iterator
 
-import AStarSolver
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from aoc.cache import cached_parser
+from aoc.grid import Grid, EAST
+from aoc.search import AStarSolver
 
-def parse_file(filename: str) -> list[list[str]]:
-    maze: list[list[str]] = []
-    with open(filename) as f:
-        for line in f:
-            maze.append([*line.strip()])
-    return maze
+WALL = ord('#')
+MOVE_COST = 1
+ROTATE_COST = 1000
+
+# A reindeer is a position in the grid and the direction it's facing
+State = tuple[int, int]
+
+
+class Maze:
+    grid: Grid
+    start: int
+    end: int
+
+    def __init__(self, grid: Grid) -> None:
+        self.grid = grid
+        self.start = grid.find('S')
+        self.end = grid.find('E')
+        self.end_x, self.end_y = grid.coords(self.end)
+
+    def neighbours(self, state: State) -> Iterator[tuple[State, int]]:
+        index, direction = state
+        forward = index + self.grid.offsets4[direction]
+        if self.grid.cells[forward] != WALL:
+            yield (forward, direction), MOVE_COST
+        yield (index, (direction + 1) % 4), ROTATE_COST
+        yield (index, (direction - 1) % 4), ROTATE_COST
+
+    def heuristic(self, state: State) -> int:
+        x, y = self.grid.coords(state[0])
+        return (abs(x - self.end_x) + abs(y - self.end_y)) * MOVE_COST
+
+    def is_end(self, state: State) -> bool:
+        return state[0] == self.end
+
+    def solver(self) -> AStarSolver[State]:
+        return AStarSolver(self.neighbours, self.heuristic)
+
+
+@cached_parser
+def parse_file(filename: str) -> Grid:
+    return Grid.from_file(filename)
 
 
 def part1(filename: str) -> int:
-    maze = parse_file(filename)
-    maze_ = AStarSolver.Maze(maze)
-    path = AStarSolver.AStarSolver().solve_maze(maze_)
-    path.reverse()
-    # new_maze = copy.copy(maze)
-    # for node in path:
-    #     new_maze[node.y][node.x] = 'O'
-    # print('\n'.join(''.join(line) for line in new_maze))
-    return sum(map(lambda a: a[0].weight(a[1]), zip(path, path[1:])))
+    maze = Maze(parse_file(filename))
+    result = maze.solver().solve((maze.start, EAST), maze.is_end)
+    # new_maze = maze.grid.copy()
+    # for index, _ in result.path:
+    #     new_maze[index] = 'O'
+    # print(new_maze)
+    return result.cost
 
 
 def part2(filename: str) -> int:
-    maze = parse_file(filename)
-    maze_ = AStarSolver.Maze(maze)
-    all_solutions = AStarSolver.AStarSolver().solve_all_maze_solutions(maze_)
-    all_coords: set[tuple[int, int]] = set()
-    for solution in all_solutions:
-        for node in solution:
-            all_coords.add((node.x, node.y))
-    new_maze = copy.copy(maze)
-    for (x, y) in all_coords:
-        new_maze[y][x] = 'O'
-    print('\n'.join(''.join(line) for line in new_maze))
-    return len(all_coords)
+    maze = Maze(parse_file(filename))
+    result = maze.solver().solve_all((maze.start, EAST), maze.is_end)
+    all_tiles = {index for index, _ in result.states()}
+    new_maze = maze.grid.copy()
+    for index in all_tiles:
+        new_maze[index] = 'O'
+    print(new_maze)
+    return len(all_tiles)
 
 
 def main():
-    time = timeit(lambda: part1('sample1.txt'), number=10)
-    print(f'Part 1: {time}')
     assert part1('sample1.txt') == 7036, part1('sample1.txt')
     assert part1('sample2.txt') == 11048
     print('Part 1: ', part1('input.txt'))
-    # assert part2('sample1.txt') == 45
-    # assert part2('sample2.txt') == 64
-    # print('Part 2: ', part2('input.txt'))
+    assert part2('sample1.txt') == 45, part2('sample1.txt')
+    assert part2('sample2.txt') == 64, part2('sample2.txt')
+    print('Part 2: ', part2('input.txt'))
 
 
 if __name__ == '__main__':
@@ -1,4 +1,3 @@
-from timeit import timeit
 from transpiled import transpiled
 
 
@@ -240,9 +239,6 @@ def part2b() -> int:
 def main():
     tests()
     assert part1('sample.txt') == '4,6,3,5,6,3,5,2,1,0'
-    time_part1 = timeit(lambda: part1('sample.txt'), number=10)
-    estimate_part2 = 117440 * time_part1
-    print(estimate_part2)
     print(part1('input.txt'))
     assert part2('sample2.txt') == 117440
     # print(part2('input.txt'))
@@ -1,6 +1,43 @@
-import AStarSolver
+import os
+import sys
+from typing import Iterator
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from aoc.cache import cached_parser
+from aoc.grid import Grid, OUTSIDE
+from aoc.search import AStarSolver
+
+WALL = ord('#')
+
+
+class Maze:
+    grid: Grid
+    start: int
+    end: int
+
+    def __init__(self, grid: Grid, start: tuple[int, int], end: tuple[int, int]) -> None:
+        self.grid = grid
+        self.start = grid.index(*start)
+        self.end = grid.index(*end)
+        self.end_x, self.end_y = end
+
+    def neighbours(self, index: int) -> Iterator[tuple[int, int]]:
+        cells = self.grid.cells
+        for offset in self.grid.offsets4:
+            cell = cells[index + offset]
+            if cell != OUTSIDE and cell != WALL:
+                yield index + offset, 1
+
+    def heuristic(self, index: int) -> int:
+        x, y = self.grid.coords(index)
+        return abs(x - self.end_x) + abs(y - self.end_y)
+
+    def is_end(self, index: int) -> bool:
+        return index == self.end
+
+
+@cached_parser
 def parse_file(filename: str) -> list[tuple[int, int]]:
     data = []
     with open(filename) as f:
@@ -9,53 +46,46 @@ def parse_file(filename: str) -> list[tuple[int, int]]:
     return data
 
 
-def get_first_valid_path(maze: AStarSolver.Maze) -> list[AStarSolver.Node]:
-    return AStarSolver.AStarSolver().solve_maze(maze)
-
-
-def path_is_valid(nodes: list[AStarSolver.Node], maze: AStarSolver.Maze) -> bool:
-    for node in nodes:
-        if not maze.node_valid(node):
-            return False
-    return True
+def get_first_valid_path(maze: Maze) -> list[int]:
+    return AStarSolver(maze.neighbours, maze.heuristic).solve(maze.start, maze.is_end).path
 
 
-def print_maze(maze_data: list[list[str]]) -> None:
-    print('\n'.join(''.join(line) for line in maze_data))
+def print_maze(maze_data: Grid) -> None:
+    print(maze_data)
 
 
 def part1(filename: str, size: int, time: int) -> int:
     data = parse_file(filename)
-    maze_data = [['.'] * size for _ in range(size)]
+    maze_data = Grid(size, size)
     for x, y in data[:time]:
-        maze_data[y][x] = '#'
+        maze_data[maze_data.index(x, y)] = '#'
     start = (0, 0)
     end = (size - 1, size - 1)
-    maze = AStarSolver.Maze(maze_data, start, end)
+    maze = Maze(maze_data, start, end)
     path = get_first_valid_path(maze)
     return len(path) - 1
 
 
 def part2(filename: str, size: int, time: int) -> tuple[int, int]:
     data = parse_file(filename)
-    maze_data = [['.'] * size for _ in range(size)]
+    maze_data = Grid(size, size)
     for x, y in data[:time]:
-        maze_data[y][x] = '#'
+        maze_data[maze_data.index(x, y)] = '#'
 
     start = (0, 0)
     end = (size - 1, size - 1)
-    maze = AStarSolver.Maze(maze_data, start, end)
-    last_known_path = get_first_valid_path(maze)
+    maze = Maze(maze_data, start, end)
+    last_known_path = set(get_first_valid_path(maze))
     remaining_data = data[time:]
     while True:
         next_x, next_y = remaining_data.pop(0)
-        maze_data[next_y][next_x] = '#'
-        # if not path_is_valid(last_known_path, maze):
-        if any(node.x == next_x and node.y == next_y for node in last_known_path):
+        next_index = maze_data.index(next_x, next_y)
+        maze_data[next_index] = '#'
+        if next_index in last_known_path:
             print('Path broke, finding new path')
             try:
-                last_known_path = get_first_valid_path(maze)
-            except IndexError:
+                last_known_path = set(get_first_valid_path(maze))
+            except ValueError:
                 print_maze(maze_data)
                 return next_x, next_y
 
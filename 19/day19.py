@@ -1,13 +1,15 @@
+import os
+import sys
 from dataclasses import dataclass
 from enum import Enum
 from functools import cache
 from typing import List, Generator
 
-try:
-    from tqdm import tqdm
-except ImportError:
-    def tqdm(x):
-        return x
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+from aoc.instrument import track_cache
+from aoc.progress import progress
 
 
 class Color(Enum):
@@ -53,6 +55,7 @@ class Game:
     designs: list[list[Color]]
 
 
+@cached_parser
 def parse_input(filename: str) -> Game:
     towels = []
     designs = []
@@ -77,6 +80,7 @@ def make_pattern(pattern: list[Color], towels: list[list[Color]]) -> Generator[l
                     yield [towel, *make_next]
 
 
+@track_cache
 @cache
 def count_possible_patterns(pattern: tuple[Color], towels: tuple[tuple[Color]]) -> int:
     if len(pattern) == 0:
@@ -104,7 +108,7 @@ def part2(filename: str) -> int:
     game = parse_input(filename)
     can_make = 0
     count_possible_patterns.cache_clear()
-    for pattern in tqdm(game.designs):
+    for pattern in progress(game.designs):
         can_make += count_possible_patterns(tuple(pattern), tuple(map(tuple, game.towels)))
     return can_make
 
@@ -1,12 +1,18 @@
+import os
+import sys
 from typing import Generator
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def parse_file(filename: str) -> list[list[str]]:
-    maze: list[list[str]] = []
-    with open(filename) as f:
-        for line in f:
-            maze.append([*line.strip()])
-    return maze
+from aoc.cache import cached_parser
+from aoc.grid import Grid
+
+WALL = ord('#')
+
+
+@cached_parser
+def parse_file(filename: str) -> Grid:
+    return Grid.from_file(filename)
 
 
 def point_in_diamond(radius) -> Generator[tuple[int, int], None, None]:
@@ -16,88 +22,59 @@ def point_in_diamond(radius) -> Generator[tuple[int, int], None, None]:
                 yield x, y
 
 
-def find_in_maze(maze: list[list[str]], to_find: str) -> tuple[int, int]:
-    for y, line in enumerate(maze):
-        for x, char in enumerate(line):
-            if char == to_find:
-                return x, y
-    raise ValueError(f'Could not find {to_find} in maze')
-
-
-def next_nodes(current_x: int, current_y: int, offset: int) -> Generator[tuple[int, int], None, None]:
-    yield current_x + offset, current_y
-    yield current_x, current_y + offset
-    yield current_x, current_y - offset
-    yield current_x - offset, current_y
-
-
-def point_is_valid(next_x: int, next_y: int, maze: list[list[str]]) -> bool:
-    if next_x < 0 or next_y < 0:
-        return False
-    if next_x >= len(maze[0]) or next_y >= len(maze):
-        return False
-    if maze[next_y][next_x] == '#':
-        return False
-    return True
-
-
-def next_valid_nodes(maze: list[list[str]], current_x: int, current_y: int, offset: int = 1) -> Generator[
-    tuple[int, int], None, None]:
-    for next_x, next_y in next_nodes(current_x, current_y, offset):
-        if point_is_valid(next_x, next_y, maze):
-            yield next_x, next_y
+def next_valid_nodes(maze: Grid, current: int) -> Generator[int, None, None]:
+    for next_index in maze.neighbours(current):
+        if maze.cells[next_index] != WALL:
+            yield next_index
 
 
-def next_valid_nodes_diamond(maze: list[list[str]], current_x: int, current_y: int, radius: int = 1) \
-        -> Generator[tuple[int, int], None, None]:
-    for point in point_in_diamond(radius):
-        if point_is_valid(current_x + point[0], current_y + point[1], maze):
-            yield current_x + point[0], current_y + point[1]
-
-
-def get_first_valid_path(maze: list[list[str]]) -> list[tuple[int, int]]:
-    start = find_in_maze(maze, 'S')
-    end = find_in_maze(maze, 'E')
+def get_first_valid_path(maze: Grid) -> list[int]:
+    start = maze.find('S')
+    end = maze.find('E')
     path = [start]
+    previous = None
     while path[-1] != end:
-        next_nodes_in_path = [node for node in next_valid_nodes(maze, *path[-1]) if node not in path]
+        next_nodes_in_path = [node for node in next_valid_nodes(maze, path[-1]) if node != previous]
         if len(next_nodes_in_path) > 1:
             raise ValueError(f'Found {len(next_nodes_in_path)} valid paths')
+        previous = path[-1]
         path.append(next_nodes_in_path.pop())
     return path
 
 
-def find_shortcuts(maze: list[list[str]], path: list[tuple[int, int]]) -> Generator[int, None, None]:
+def find_shortcuts_with_offsets(maze: Grid, path: list[int], offsets: list[tuple[int, int]]) \
+        -> Generator[int, None, None]:
+    # The path never contains a wall, so a shortcut is valid when its end is on the path
+    steps = {node: idx for idx, node in enumerate(path)}
+    jumps = [(dx, dy, dx + dy * maze.stride, abs(dx) + abs(dy)) for dx, dy in offsets]
     for idx, node in enumerate(path):
-        for shortcut in next_valid_nodes(maze, *node, 2):
-            if shortcut in path:
-                idx_path = path.index(shortcut)
-                savings = idx_path - idx - 2
-                if savings > 0:
-                    yield savings
+        x, y = maze.coords(node)
+        for dx, dy, offset, distance in jumps:
+            # bounds are checked on the coordinates, a long jump could wrap around into another row
+            if not (0 <= x + dx < maze.width and 0 <= y + dy < maze.height):
+                continue
+            idx_path = steps.get(node + offset)
+            if idx_path is None:
+                continue
+            savings = idx_path - idx - distance
+            if savings > 0:
+                yield savings
 
 
-def find_long_shortcuts(maze: list[list[str]], path: list[tuple[int, int]]) -> Generator[int, None, None]:
-    for idx, node in enumerate(path):
-        for shortcut in next_valid_nodes_diamond(maze, *node, 20):
-            dx = abs(shortcut[0] - node[0])
-            dy = abs(shortcut[1] - node[1])
-            if dx + dy > 20:
-                continue
-            if shortcut in path:
-                idx_path = path.index(shortcut)
-                savings = idx_path - idx - dx - dy
-                if savings > 0:
-                    yield savings
+def find_shortcuts(maze: Grid, path: list[int]) -> Generator[int, None, None]:
+    return find_shortcuts_with_offsets(maze, path, [(2, 0), (0, 2), (0, -2), (-2, 0)])
+
+
+def find_long_shortcuts(maze: Grid, path: list[int]) -> Generator[int, None, None]:
+    return find_shortcuts_with_offsets(maze, path, list(point_in_diamond(20)))
 
 
-def print_maze(maze_data: list[list[str]]) -> None:
-    print('\n'.join(''.join(line) for line in maze_data))
+def print_maze(maze_data: Grid) -> None:
+    print(maze_data)
 
 
 def part1(filename: str) -> list[int]:
     maze_data = parse_file(filename)
-    # maze = AStarSolver.Maze(maze_data)
     path = get_first_valid_path(maze_data)
     shortcuts = list(find_shortcuts(maze_data, path))
 
@@ -106,7 +83,6 @@ def part1(filename: str) -> list[int]:
 
 def part2(filename: str) -> list[int]:
     maze_data = parse_file(filename)
-    # maze = AStarSolver.Maze(maze_data)
     path = get_first_valid_path(maze_data)
     shortcuts = list(find_long_shortcuts(maze_data, path))
 
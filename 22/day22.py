@@ -1,10 +1,14 @@
-try:
-    from tqdm import tqdm
-except ImportError:
-    def tqdm(x):
-        return x
+import os
+import sys
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from aoc.cache import cached_parser
+from aoc.instrument import counted
+from aoc.progress import progress
+
+
+@counted
 def get_next_secret_number(secret_number: int) -> int:
     secret_number = ((secret_number * 64) ^ secret_number) & 0xFFFFFF
     secret_number = ((secret_number // 32) ^ secret_number) & 0xFFFFFF
@@ -27,6 +31,7 @@ valid_chain = [
 ]
 
 
+@cached_parser
 def parse_file(filename: str) -> list[int]:
     with open(filename) as f:
         return list(map(int, f))
@@ -94,7 +99,7 @@ def part2(filename: str) -> int:
         monkeys.append(values)
     possible_changes = generate_possible_change_sets()
     bananas_per_change = []
-    for possible_change in tqdm(possible_changes):
+    for possible_change in progress(possible_changes):
         total_bananas = 0
         for idx, monkey in enumerate(changes):
             found_at = find_list_in_list(monkey, possible_change)
@@ -115,7 +120,6 @@ def main():
     print('Part One:', part1("input.txt"))
 
     assert part2("sample2.txt") == 23
-    # runtime: ~18 minutes
     print('Part 2:', part2("input.txt"))
 
 
@@ -1,6 +1,10 @@
+import os
+import sys
 from dataclasses import dataclass
 
-from PIL.Image import composite
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
 
 
 @dataclass
@@ -34,6 +38,7 @@ class Network:
         return connected_to
 
 
+@cached_parser
 def parse_input(filename: str) -> list[tuple[str, str]]:
     output = []
     with open(filename) as f:
@@ -1,7 +1,11 @@
+import os
 import re
+import sys
 from dataclasses import dataclass
 
-import z4
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
 
 re_gate = re.compile(r'(\w{3}) (XOR|OR|AND) (\w{3}) -> (\w{3})')
 
@@ -12,6 +16,7 @@ class InitialState:
     gates: list[tuple[str, str, str, str]]
 
 
+@cached_parser
 def parse_input(filename: str) -> InitialState:
     wires: list[tuple[str, int]] = []
     gates: list[tuple[str, str, str, str]] = []
@@ -28,6 +33,9 @@ def parse_input(filename: str) -> InitialState:
 
 
 def part1(filename: str) -> int:
+    # https://pypi.org/project/z4-solver/, imported here so the parser can be used without it
+    import z4
+
     state = parse_input(filename)
     wires: dict[str, z4.Bool] = {}
     solver = z4.Solver()
@@ -1,5 +1,11 @@
+import os
+import sys
 from typing import Literal
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc.cache import cached_parser
+
 key_lock = tuple[int, int, int, int, int]
 
 
@@ -10,6 +16,7 @@ def parse_key_lock(lines: list[str]) -> tuple[Literal['key', 'lock'], key_lock]:
     return item_type, tuple(map(lambda a: a.count('#') - 1, transposed))
 
 
+@cached_parser
 def parse_input(filename: str) -> tuple[list[key_lock], list[key_lock]]:
     keys: list[key_lock] = []
     locks: list[key_lock] = []
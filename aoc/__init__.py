@@ -0,0 +1,11 @@
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def usable_cpus() -> int:
+    # the CPUs this process may run on, which can be fewer than the machine has (taskset, containers)
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS and Windows
+        return os.cpu_count() or 1
@@ -0,0 +1,58 @@
+from collections import deque
+from typing import Iterable, Iterator
+
+
+class AhoCorasick:
+    # Finds all occurrences of any number of words in a single pass over the text.
+    # The failure links are folded into the transitions when it's built, so matching
+    # is one dict lookup per byte of text, whatever the number of words.
+    words: list[bytes]
+    transitions: list[dict[int, int]]
+    # the indexes of the words that end in every state
+    outputs: list[tuple[int, ...]]
+
+    def __init__(self, words: Iterable[bytes]) -> None:
+        self.words = list(dict.fromkeys(words))
+        if b'' in self.words:
+            raise ValueError('Can not search for an empty word')
+        self.transitions = [{}]
+        self.outputs = [()]
+        for i, word in enumerate(self.words):
+            state = 0
+            for character in word:
+                if character not in self.transitions[state]:
+                    self.transitions[state][character] = len(self.transitions)
+                    self.transitions.append({})
+                    self.outputs.append(())
+                state = self.transitions[state][character]
+            self.outputs[state] += (i,)
+        self._add_failure_transitions()
+
+    def _add_failure_transitions(self) -> None:
+        # Breadth first, so the state a failure goes to already has all its transitions
+        alphabet = {character for word in self.words for character in word}
+        failure = [0] * len(self.transitions)
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = self.transitions[failure[state]]
+            self.outputs[state] += self.outputs[failure[state]]
+            transitions = self.transitions[state]
+            for character in alphabet:
+                if character in transitions:
+                    child = transitions[character]
+                    failure[child] = fallback.get(character, 0)
+                    queue.append(child)
+                elif character in fallback:
+                    transitions[character] = fallback[character]
+
+    def find(self, text: bytes) -> Iterator[tuple[int, int]]:
+        # every occurrence as the position it starts at and the index of the word
+        transitions = self.transitions
+        outputs = self.outputs
+        words = self.words
+        state = 0
+        for end, character in enumerate(text, 1):
+            state = transitions[state].get(character, 0)
+            for i in outputs[state]:
+                yield end - len(words[i]), i
@@ -0,0 +1,90 @@
+import json
+import os
+import platform
+from dataclasses import dataclass
+
+from aoc import ROOT
+
+DEFAULT_THRESHOLD = 20.0
+
+# Differences below these are noise, even if they're a large percentage of a very fast part
+MIN_TIME_DELTA = 0.001
+MIN_MEMORY_DELTA = 64 * 1024
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float | str
+    current: float | str
+
+    def __str__(self):
+        if self.metric == 'answer':
+            return f'{self.key}: answer changed from {self.baseline} to {self.current}'
+        if self.metric == 'error':
+            return f'{self.key}: failed with {self.current} (answer was {self.baseline})'
+        return f'{self.key}: {self.metric} went from {self.baseline:.6g} to {self.current:.6g} ' \
+               f'({self.current / self.baseline - 1:+.0%})'
+
+
+def default_path() -> str:
+    # Timings between CPython and PyPy (or two CPython versions) aren't comparable, so they each get their own file
+    implementation = platform.python_implementation().lower()
+    version = '.'.join(platform.python_version_tuple()[:2])
+    return os.path.join(ROOT, 'baselines', f'{implementation}-{version}.json')
+
+
+def result_key(result) -> str:
+    return f'{result.name}[{result.filename}]'
+
+
+def load(path: str, missing_ok: bool = False) -> dict[str, dict]:
+    # Comparing against a baseline that isn't there would pass without checking anything
+    if missing_ok and not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['entries']
+
+
+def save(path: str, results: list, environment: dict) -> None:
+    # Merge into the existing baseline, so benchmarking a single day only updates that day
+    entries = load(path, missing_ok=True)
+    for result in results:
+        if not result.runs:
+            continue
+        entries[result_key(result)] = {
+            'median': result.median,
+            'min': result.min,
+            'peak_memory': result.peak_memory,
+            'answer': result.answer,
+        }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'environment': environment, 'entries': dict(sorted(entries.items()))}, f, indent=2)
+        f.write('\n')
+
+
+def compare(entries: dict[str, dict], results: list, threshold: float = DEFAULT_THRESHOLD) -> list[Regression]:
+    factor = 1 + threshold / 100
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        if key not in entries:
+            continue
+        entry = entries[key]
+        if result.error:
+            # crashing or timing out is worse than any slowdown
+            regressions.append(Regression(key, 'error', entry['answer'], result.error))
+            continue
+        if not result.runs:
+            continue
+        if entry['answer'] is not None and entry['answer'] != result.answer:
+            regressions.append(Regression(key, 'answer', entry['answer'], result.answer))
+        if result.median > entry['median'] * factor and result.median - entry['median'] > MIN_TIME_DELTA:
+            regressions.append(Regression(key, 'median', entry['median'], result.median))
+        if entry['peak_memory'] and result.peak_memory \
+                and result.peak_memory > entry['peak_memory'] * factor \
+                and result.peak_memory - entry['peak_memory'] > MIN_MEMORY_DELTA:
+            regressions.append(Regression(key, 'peak_memory', entry['peak_memory'], result.peak_memory))
+    return regressions
@@ -0,0 +1,537 @@
+import argparse
+import contextlib
+import importlib.util
+import inspect
+import json
+import math
+import os
+import platform
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Callable
+
+from aoc import ROOT, baseline, cache, generators, instrument, progress, usable_cpus
+
+RE_DAY = re.compile(r'^\d{2}$')
+RE_PART = re.compile(r'^part\d+[a-z]?$')
+
+# Parts that take more arguments than just the filename
+EXTRA_ARGS: dict[tuple[str, str], tuple] = {
+    ('14', 'sample.txt'): (11, 7),
+    ('14', 'input.txt'): (101, 103),
+    ('18', 'sample.txt'): (7, 12),
+    ('18', 'input.txt'): (71, 1024),
+}
+
+# Parts that can't be benchmarked, either for every file (day, part) or for a single file (day, part, filename).
+# Inputs from aoc.generators use 'generated' as filename.
+SKIP: dict[tuple[str, ...], str] = {
+    ('13', 'part2'): 'not implemented',
+    ('14', 'part2'): 'writes 10.000 images',
+    ('17', 'part2', 'sample.txt'): 'never finishes, program is not a quine',
+    ('17', 'part2', 'input.txt'): 'brute force, does not finish',
+    ('17', 'part2', 'generated'): 'brute force, does not finish',
+}
+
+# Imports a day in a fresh interpreter and prints how long that took, the only output that's not from the day
+IMPORT_SCRIPT = '''
+import importlib.util, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('day', sys.argv[1])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(time.perf_counter() - start)
+'''
+
+# Days already loaded in this process. Forked workers inherit the days the main process loaded.
+_modules: dict[str, ModuleType] = {}
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Task:
+    day: str
+    part: str
+    filename: str
+    # set for generated inputs
+    size: int | None = None
+    args: tuple | None = None
+
+
+@dataclass
+class Result:
+    day: str
+    part: str
+    filename: str
+    runs: list[float] = field(default_factory=list)
+    answer: str | None = None
+    error: str | None = None
+    skipped: str | None = None
+    peak_memory: int | None = None
+    size: int | None = None
+    # what aoc.instrument recorded while running the part, when enabled
+    instrumentation: dict | None = None
+
+    @property
+    def name(self) -> str:
+        return f'day{self.day}.{self.part}'
+
+    @property
+    def min(self) -> float | None:
+        return min(self.runs) if self.runs else None
+
+    @property
+    def median(self) -> float | None:
+        return statistics.median(self.runs) if self.runs else None
+
+    @property
+    def p95(self) -> float | None:
+        return percentile(self.runs, 95) if self.runs else None
+
+    def to_json(self) -> dict:
+        return {
+            'day': self.day,
+            'part': self.part,
+            'file': self.filename,
+            'answer': self.answer,
+            'error': self.error,
+            'skipped': self.skipped,
+            'runs': self.runs,
+            'min': self.min,
+            'median': self.median,
+            'p95': self.p95,
+            'peak_memory': self.peak_memory,
+            'size': self.size,
+        }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    # nearest-rank percentile, doesn't interpolate between runs
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def find_days() -> list[str]:
+    return sorted(name for name in os.listdir(ROOT)
+                  if RE_DAY.match(name) and os.path.isfile(day_file(name)))
+
+
+def day_dir(day: str) -> str:
+    return os.path.join(ROOT, day)
+
+
+def day_file(day: str) -> str:
+    return os.path.join(day_dir(day), f'day{day}.py')
+
+
+def find_input_files(day: str, kind: str = 'all') -> list[str]:
+    files = sorted(os.listdir(day_dir(day)))
+    samples = [name for name in files if name.startswith('sample') and name.endswith('.txt')]
+    inputs = [name for name in files if name == 'input.txt']
+    match kind:
+        case 'sample':
+            return samples
+        case 'input':
+            return inputs
+        case 'all':
+            return samples + inputs
+        case _:
+            raise ValueError(f'Unknown file kind {kind}')
+
+
+def load_day(day: str) -> ModuleType:
+    # The day is registered as dayNN, so the parse cache can pickle objects of its classes.
+    # Helpers a day imports from its own directory (day 17 imports transpiled) are dropped
+    # from sys.modules again, so days can't pick up each other's helpers with the same name.
+    directory = day_dir(day)
+    module_name = f'day{day}'
+    known_modules = set(sys.modules)
+    sys.path.insert(0, directory)
+    try:
+        with contextlib.chdir(directory), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            spec = importlib.util.spec_from_file_location(module_name, day_file(day))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    finally:
+        sys.path.remove(directory)
+        for name in set(sys.modules) - known_modules - {module_name}:
+            module_file = getattr(sys.modules[name], '__file__', None) or ''
+            if module_file.startswith(directory + os.sep):
+                del sys.modules[name]
+    return module
+
+
+def find_parts(module: ModuleType) -> list[tuple[str, Callable]]:
+    parts = []
+    for name, value in vars(module).items():
+        if not RE_PART.match(name) or not inspect.isfunction(value):
+            continue
+        if not inspect.signature(value).parameters:
+            continue  # doesn't read an input file
+        parts.append((name, value))
+    return sorted(parts)
+
+
+def clear_caches(module: ModuleType) -> None:
+    # functools.cache state would otherwise leak from one repetition into the next
+    for value in vars(module).values():
+        if hasattr(value, 'cache_clear') and getattr(value, '__module__', None) == module.__name__:
+            value.cache_clear()
+
+
+def skip_reason(day: str, part: str, filename: str) -> str | None:
+    return SKIP.get((day, part, filename)) or SKIP.get((day, part))
+
+
+def format_answer(answer) -> str:
+    text = str(answer)
+    if len(text) > 60:
+        text = text[:57] + '...'
+    return text
+
+
+def measure_memory(module: ModuleType, function: Callable, filename: str, args: tuple) -> int:
+    # Separate run, tracemalloc slows everything down too much to do this while timing
+    clear_caches(module)
+    tracemalloc.start()
+    try:
+        function(filename, *args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def time_limit(seconds: float | None):
+    # SIGALRM interrupts the running part, so this only works in the main thread of a process
+    # (pool workers run their tasks there) and not on Windows, where the limit is ignored.
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    def alarm(signum, frame):
+        raise TaskTimeout(f'did not finish within {seconds:g}s')
+
+    previous = signal.signal(signal.SIGALRM, alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_part(module: ModuleType, day: str, part: str, function: Callable, filename: str,
+             repeat: int, max_time: float, memory: bool = False, cold: bool = False,
+             timeout: float | None = None, size: int | None = None, args: tuple | None = None) -> Result:
+    result = Result(day, part, os.path.basename(filename), size=size)
+    result.skipped = skip_reason(day, part, 'generated' if size is not None else filename)
+    if result.skipped:
+        return result
+    if args is None:
+        args = EXTRA_ARGS.get((day, filename), ())
+    phase_name = f'{result.name}:{result.filename}'
+    try:
+        with (contextlib.chdir(day_dir(day)), open(os.devnull, 'w') as devnull,
+              contextlib.redirect_stdout(devnull), time_limit(timeout)):
+            # always run once, repeat until either the number of repetitions or the time budget is used up
+            while len(result.runs) < repeat and (not result.runs or sum(result.runs) < max_time):
+                clear_caches(module)
+                if cold:
+                    cache.clear()
+                try:
+                    with instrument.phase(phase_name), instrument.phase('solve'):
+                        start = time.perf_counter()
+                        answer = function(filename, *args)
+                        result.runs.append(time.perf_counter() - start)
+                except Exception as e:
+                    result.error = f'{type(e).__name__}: {e}'
+                    break
+                with instrument.phase(phase_name), instrument.phase('output'):
+                    result.answer = format_answer(answer)
+            if memory and not result.error:
+                result.peak_memory = measure_memory(module, function, filename, args)
+    except TaskTimeout as e:
+        result.error = f'{type(e).__name__}: {e}'
+    return result
+
+
+def get_day(day: str) -> ModuleType:
+    if day not in _modules:
+        _modules[day] = load_day(day)
+    return _modules[day]
+
+
+def plan_tasks(days: list[str], parts: list[str] | None, kind: str,
+               sizes: list[int] | None = None, seed: int = 0) -> tuple[list[Task], list[Result]]:
+    # Every part and input file of the days, in day order. Days that fail to load, and inputs that fail to
+    # generate, are returned as results.
+    # With sizes the parts run against generated inputs of those sizes instead of the input files.
+    tasks = []
+    failed = []
+    for day in days:
+        try:
+            module = get_day(day)
+        except Exception as e:
+            failed.append(Result(day, '-', '-', error=f'{type(e).__name__}: {e}'))
+            continue
+        for part, _ in find_parts(module):
+            if parts and part not in parts:
+                continue
+            if sizes:
+                generator = generators.GENERATORS[day]
+                for size in sizes:
+                    try:
+                        filename = generators.generated_file(day, size, seed)
+                    except Exception as e:
+                        # sizes the generator can't make (like over 99 bits for day 24) fail on their own
+                        failed.append(Result(day, part, f'size{size}.txt', size=size,
+                                             error=f'{type(e).__name__}: {e}'))
+                        continue
+                    tasks.append(Task(day, part, filename, size, generator.args(size)))
+            else:
+                tasks.extend(Task(day, part, filename) for filename in find_input_files(day, kind))
+    return tasks, failed
+
+
+def run_task(task: Task, repeat: int, max_time: float, memory: bool = False, cold: bool = False,
+             timeout: float | None = None) -> Result:
+    try:
+        module = get_day(task.day)
+    except Exception as e:
+        return Result(task.day, task.part, task.filename, error=f'{type(e).__name__}: {e}')
+    result = run_part(module, task.day, task.part, getattr(module, task.part), task.filename,
+                      repeat, max_time, memory, cold, timeout, task.size, task.args)
+    if instrument.enabled:
+        result.instrumentation = instrument.collect()
+    return result
+
+
+def run_import(day: str, repeat: int) -> Result:
+    # Every run needs a new interpreter, in this one the day and everything it imports is already loaded
+    result = Result(day, 'import', '-')
+    # an extra first run, which writes the .pyc files of the day and its imports and isn't counted
+    for run in range(repeat + 1):
+        process = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT, day_file(day)], cwd=day_dir(day),
+                                 capture_output=True, text=True)
+        if process.returncode:
+            result.error = process.stderr.strip().splitlines()[-1]
+            break
+        if run:
+            result.runs.append(float(process.stdout.split()[-1]))
+    return result
+
+
+def init_worker(parse_cache: str | None, instrumented: bool) -> None:
+    progress.enabled = False
+    if instrumented:
+        instrument.enable()
+    if parse_cache:
+        cache.enable_disk_cache(parse_cache)
+
+
+def run_tasks(tasks: list[Task], jobs: int, repeat: int, max_time: float, memory: bool = False,
+              cold: bool = False, timeout: float | None = None, parse_cache: str | None = None) -> list[Result]:
+    if jobs <= 1 or len(tasks) <= 1:
+        return [run_task(task, repeat, max_time, memory, cold, timeout) for task in tasks]
+    with ProcessPoolExecutor(min(jobs, len(tasks)), initializer=init_worker,
+                             initargs=(parse_cache, instrument.enabled)) as executor:
+        futures = [executor.submit(run_task, task, repeat, max_time, memory, cold, timeout) for task in tasks]
+        results = []
+        # collected in submission order, so the results stay in day order however the tasks finish
+        for task, future in zip(tasks, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:  # the worker died, e.g. killed by the OOM killer
+                results.append(Result(task.day, task.part, task.filename, error=f'{type(e).__name__}: {e}'))
+        return results
+
+
+def format_time(value: float | None) -> str:
+    if value is None:
+        return '-'
+    if value < 1e-3:
+        return f'{value * 1e6:.0f}us'
+    if value < 1:
+        return f'{value * 1e3:.1f}ms'
+    return f'{value:.2f}s'
+
+
+def format_memory(value: int | None) -> str:
+    if value is None:
+        return '-'
+    if value < 1024 * 1024:
+        return f'{value / 1024:.0f}KiB'
+    return f'{value / 1024 / 1024:.1f}MiB'
+
+
+def print_table(results: list[Result], wall_time: float) -> None:
+    header = f'{"part":<14} {"file":<14} {"runs":>4} {"min":>9} {"median":>9} {"p95":>9} {"memory":>9}  answer'
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        if result.skipped:
+            status = f'skipped: {result.skipped}'
+        elif result.error:
+            status = f'error: {result.error}'
+        else:
+            status = result.answer or ''
+        print(f'{result.name:<14} {result.filename:<14} {len(result.runs):>4} {format_time(result.min):>9} '
+              f'{format_time(result.median):>9} {format_time(result.p95):>9} {format_memory(result.peak_memory):>9}  {status}')
+    print('-' * len(header))
+    print(f'Wall time: {format_time(wall_time)}, total of medians: '
+          f'{format_time(sum(result.median for result in results if result.runs))}')
+
+
+def print_scaling(results: list[Result]) -> None:
+    # How the median grows between consecutive sizes, as exponent: 1 is linear, 2 quadratic
+    by_part: dict[str, list[Result]] = {}
+    for result in results:
+        if result.size is not None and result.runs:
+            by_part.setdefault(result.name, []).append(result)
+    if not by_part:
+        return
+    print()
+    print('Scaling (median time ~ size^k):')
+    for name, part_results in by_part.items():
+        part_results.sort(key=lambda result: result.size)
+        steps = []
+        for smaller, larger in zip(part_results, part_results[1:]):
+            if larger.size == smaller.size or not smaller.median:
+                continue
+            exponent = math.log(larger.median / smaller.median) / math.log(larger.size / smaller.size)
+            steps.append(f'{smaller.size}->{larger.size}: k={exponent:.2f}')
+        print(f'{name:<14} {", ".join(steps) or "-"}')
+
+
+def environment() -> dict:
+    return {
+        'implementation': platform.python_implementation(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def write_json(path: str, results: list[Result], wall_time: float) -> None:
+    data = {
+        **environment(),
+        'wall_time': wall_time,
+        'results': [result.to_json() for result in results],
+    }
+    if path == '-':
+        json.dump(data, sys.stdout, indent=2)
+        print()
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark the part1/part2 solutions of every day')
+    parser.add_argument('days', nargs='*', help='days to run, e.g. 01 06 (default: all)')
+    parser.add_argument('--parts', nargs='+', help='only run these parts, e.g. part1')
+    parser.add_argument('--files', choices=['sample', 'input', 'all'], default='all',
+                        help='which input files to run against')
+    parser.add_argument('--repeat', type=int, default=5, help='maximum number of runs per part and file')
+    parser.add_argument('--max-time', type=float, default=10.0,
+                        help='stop repeating a part once its runs took this many seconds')
+    parser.add_argument('--json', metavar='PATH', help='write the results as json, use - for stdout')
+    parser.add_argument('--memory', action='store_true', help='also measure the peak memory of every part')
+    parser.add_argument('--cold', action='store_true',
+                        help='clear the parse cache before every run, so every run parses its input again')
+    parser.add_argument('--parse-cache', nargs='?', metavar='DIR', const=cache.DEFAULT_DISK_DIRECTORY,
+                        help='also keep parsed inputs on disk, so they are reused between runs of the benchmark')
+    parser.add_argument('--save-baseline', nargs='?', metavar='PATH', const=baseline.default_path(),
+                        help='store the results as baseline (default: baselines/<interpreter>.json)')
+    parser.add_argument('--compare', nargs='?', metavar='PATH', const=baseline.default_path(),
+                        help='fail when a part is slower, uses more memory or has a different answer than the baseline')
+    parser.add_argument('--threshold', type=float, default=baseline.DEFAULT_THRESHOLD,
+                        help='percentage a part may be slower than the baseline (default: %(default)s)')
+    parser.add_argument('--instrument', metavar='PREFIX',
+                        help='record phase timings, call counts and cache hit ratios (see aoc/instrument.py) '
+                             'and write them to PREFIX.json and PREFIX.folded (for flamegraph.pl or speedscope). '
+                             'Runs every part once')
+    parser.add_argument('--imports', action='store_true',
+                        help='measure how long importing every day takes (in a new interpreter) instead of the parts')
+    parser.add_argument('--sizes', nargs='+', type=int, metavar='SIZE',
+                        help='run against generated inputs of these sizes instead of the input files, '
+                             'see python -m aoc.generators --list for what the size means per day')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the generated inputs')
+    parser.add_argument('-j', '--jobs', type=int, nargs='?', default=1, const=0,
+                        help='run parts in this many processes at once, without a number one per usable CPU. '
+                             'Parts compete for memory bandwidth and turbo boost, so timings are less reliable')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='stop a part (all its runs on one file) after this many seconds and report it as error')
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    days = [day.zfill(2) for day in args.days] or find_days()
+    memory = args.memory or args.save_baseline is not None or args.compare is not None
+    if args.parse_cache:
+        cache.enable_disk_cache(args.parse_cache)
+    repeat = args.repeat
+    if args.instrument:
+        # before the days are imported, so their counted functions get wrapped
+        instrument.enable()
+        repeat = 1
+    if args.compare:
+        # before running anything, a missing baseline shouldn't only show up after minutes of benchmarks
+        try:
+            baseline_entries = baseline.load(args.compare)
+        except FileNotFoundError:
+            sys.exit(f'No baseline at {args.compare}, save one first with --save-baseline')
+    jobs = args.jobs or usable_cpus()
+    progress.enabled = False
+    start = time.perf_counter()
+    if args.imports:
+        results = [run_import(day, repeat) for day in days]
+    else:
+        tasks, results = plan_tasks(days, args.parts, args.files, args.sizes, args.seed)
+        results.extend(run_tasks(tasks, jobs, repeat, args.max_time, memory, args.cold, args.timeout,
+                                 args.parse_cache))
+    results.sort(key=lambda result: result.day)
+    wall_time = time.perf_counter() - start
+    if args.json != '-':
+        print_table(results, wall_time)
+        print_scaling(results)
+    if args.instrument:
+        recorded: dict = {}
+        for result in results:
+            if result.instrumentation:
+                instrument.merge(recorded, result.instrumentation)
+        instrument.print_report(recorded, sys.stdout if args.json != '-' else sys.stderr)
+        instrument.write_json(f'{args.instrument}.json', recorded)
+        instrument.write_folded(f'{args.instrument}.folded', recorded)
+    if args.json:
+        write_json(args.json, results, wall_time)
+    if args.compare:
+        regressions = baseline.compare(baseline_entries, results, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) compared to {args.compare}:', file=sys.stderr)
+            for regression in regressions:
+                print(f'  {regression}', file=sys.stderr)
+            sys.exit(1)
+    if args.save_baseline:
+        baseline.save(args.save_baseline, results, environment())
+        print(f'Saved baseline to {args.save_baseline}')
+
+
+if __name__ == '__main__':
+    main()
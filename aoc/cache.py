@@ -0,0 +1,132 @@
+import functools
+import os
+from collections import OrderedDict
+from typing import Callable, TypeVar
+
+from aoc import ROOT, instrument
+
+T = TypeVar('T')
+
+# the total size of the pickled inputs kept in memory, the least recently used ones are dropped beyond it
+MAX_MEMORY_BYTES = 1 << 28
+MAX_DISK_ENTRIES = 256
+DEFAULT_DISK_DIRECTORY = os.path.join(ROOT, '.parse_cache')
+
+# Parsed inputs are kept pickled, every hit unpickles a fresh copy.
+# Solvers are free to modify what they get (day 14 moves its robots, day 15 its boxes)
+# without changing the cached version.
+_memory: OrderedDict[tuple, bytes] = OrderedDict()
+_memory_bytes = 0
+_disk_directory: str | None = os.environ.get('AOC_PARSE_CACHE') or None
+enabled = True
+
+
+def enable_disk_cache(directory: str = DEFAULT_DISK_DIRECTORY) -> None:
+    global _disk_directory
+    os.makedirs(directory, exist_ok=True)
+    _disk_directory = directory
+
+
+def disable_disk_cache() -> None:
+    global _disk_directory
+    _disk_directory = None
+
+
+def clear() -> None:
+    global _memory_bytes
+    _memory.clear()
+    _memory_bytes = 0
+
+
+def file_hash(filename: str) -> str:
+    import hashlib
+
+    # in blocks, so hashing a big input doesn't read all of it into memory
+    with open(filename, 'rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+@functools.cache
+def package_hash() -> str:
+    # Parsers return classes from the aoc package (like Grid), those pickles are stale when it changes too
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return ''.join(file_hash(os.path.join(directory, name)) for name in sorted(os.listdir(directory))
+                   if name.endswith('.py'))
+
+
+@functools.cache
+def source_hash(function: Callable) -> str:
+    # The disk cache has to be invalidated when the parser (or anything else in its file) changes
+    return file_hash(function.__code__.co_filename) + package_hash()
+
+
+def _remember(key: tuple, data: bytes) -> None:
+    global _memory_bytes
+    if key in _memory:
+        _memory_bytes -= len(_memory[key])
+    _memory[key] = data
+    _memory.move_to_end(key)
+    _memory_bytes += len(data)
+    while _memory_bytes > MAX_MEMORY_BYTES:
+        _, dropped = _memory.popitem(last=False)
+        _memory_bytes -= len(dropped)
+
+
+def _disk_path(key: tuple) -> str:
+    import hashlib
+
+    name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    return os.path.join(_disk_directory, f'{name}.pickle.z')
+
+
+def _load_from_disk(key: tuple) -> bytes | None:
+    import zlib
+
+    path = _disk_path(key)
+    try:
+        with open(path, 'rb') as f:
+            data = zlib.decompress(f.read())
+    except (FileNotFoundError, zlib.error):
+        return None
+    os.utime(path)  # eviction removes the least recently used files
+    return data
+
+
+def _store_on_disk(key: tuple, data: bytes) -> None:
+    import zlib
+
+    os.makedirs(_disk_directory, exist_ok=True)
+    with open(_disk_path(key), 'wb') as f:
+        f.write(zlib.compress(data))
+    entries = [os.path.join(_disk_directory, name) for name in os.listdir(_disk_directory)
+               if name.endswith('.pickle.z')]
+    if len(entries) > MAX_DISK_ENTRIES:
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - MAX_DISK_ENTRIES]:
+            os.remove(path)
+
+
+def cached_parser(parser: Callable[..., T]) -> Callable[..., T]:
+    @functools.wraps(parser)
+    def wrapper(filename: str, *args) -> T:
+        import pickle
+
+        if not enabled:
+            with instrument.phase('parse'):
+                return parser(filename, *args)
+        key = (parser.__module__, parser.__qualname__, source_hash(parser), file_hash(filename), args)
+        data = _memory.get(key)
+        if data is None and _disk_directory is not None:
+            data = _load_from_disk(key)
+        if data is None:
+            with instrument.phase('parse'):
+                result = parser(filename, *args)
+            data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+            if _disk_directory is not None:
+                _store_on_disk(key, data)
+            _remember(key, data)
+            return result
+        _remember(key, data)
+        return pickle.loads(data)
+
+    return wrapper
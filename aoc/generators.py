@@ -0,0 +1,493 @@
+import argparse
+import itertools
+import math
+import os
+import random
+import string
+import sys
+from dataclasses import dataclass
+from typing import Callable
+
+from aoc import ROOT
+
+DEFAULT_DIRECTORY = os.path.join(ROOT, '.generated')
+
+
+@dataclass(frozen=True)
+class Generator:
+    day: str
+    # what the size counts, sizes of grid days are the number of cells so the runtimes of all days scale alike
+    unit: str
+    function: Callable[[int, random.Random], str]
+    # extra arguments for the parts, like the field size of day 14
+    args: Callable[[int], tuple] = lambda size: ()
+
+
+GENERATORS: dict[str, Generator] = {}
+
+
+def generator(day: str, unit: str, args: Callable[[int], tuple] = lambda size: ()):
+    def register(function: Callable[[int, random.Random], str]) -> Callable[[int, random.Random], str]:
+        GENERATORS[day] = Generator(day, unit, function, args)
+        return function
+
+    return register
+
+
+def side(cells: int, minimum: int = 4) -> int:
+    return max(math.isqrt(cells), minimum)
+
+
+def odd_side(cells: int, minimum: int = 5) -> int:
+    return side(cells, minimum) | 1
+
+
+def lines(rows) -> str:
+    return '\n'.join(rows) + '\n'
+
+
+@generator('01', 'lines')
+def generate_01(size: int, rng: random.Random) -> str:
+    left = [rng.randrange(10000, 100000) for _ in range(size)]
+    # half of the right column repeats numbers of the left one, so part 2 has something to count
+    right = [rng.choice(left) if rng.random() < 0.5 else rng.randrange(10000, 100000) for _ in range(size)]
+    return lines(f'{a}   {b}' for a, b in zip(left, right))
+
+
+@generator('02', 'reports')
+def generate_02(size: int, rng: random.Random) -> str:
+    reports = []
+    for _ in range(size):
+        level = rng.randrange(1, 90)
+        sign = rng.choice((1, -1))
+        report = [level]
+        for _ in range(rng.randrange(4, 8)):
+            report.append(report[-1] + sign * rng.randrange(1, 4))
+        if rng.random() < 0.5:
+            report[rng.randrange(len(report))] += rng.choice((-3, -1, 0, 2, 5))
+        reports.append(' '.join(map(str, report)))
+    return lines(reports)
+
+
+@generator('03', 'instructions')
+def generate_03(size: int, rng: random.Random) -> str:
+    noise = ['mul[3,7]', 'mul(32,64]', 'mul ( 2 , 4 )', 'do_not_', 'don\'t', 'mul(4*', '?mul(6,9!', 'what()',
+             'from()', 'select()', 'how()', 'when()', 'mul(1234,5)', '}']
+    tokens = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.4:
+            tokens.append(f'mul({rng.randrange(1, 1000)},{rng.randrange(1, 1000)})')
+        elif roll < 0.45:
+            tokens.append('do()')
+        elif roll < 0.5:
+            tokens.append('don\'t()')
+        else:
+            tokens.append(rng.choice(noise) + ''.join(rng.choices(string.punctuation, k=rng.randrange(3))))
+    memory = ''.join(tokens)
+    return lines(memory[start:start + 3000] for start in range(0, len(memory), 3000))
+
+
+@generator('04', 'cells')
+def generate_04(size: int, rng: random.Random) -> str:
+    width = side(size)
+    return lines(''.join(rng.choices('XMAS', k=width)) for _ in range(width))
+
+
+@generator('05', 'updates')
+def generate_05(size: int, rng: random.Random) -> str:
+    # every pair of pages has a rule, like the real input
+    pages = rng.sample(range(10, 100), 49)
+    rules = [f'{a}|{b}' for i, a in enumerate(pages) for b in pages[i + 1:]]
+    rng.shuffle(rules)
+    order = {page: i for i, page in enumerate(pages)}
+    updates = []
+    for _ in range(size):
+        update = rng.sample(pages, rng.randrange(5, 24, 2))
+        if rng.random() < 0.5:
+            update.sort(key=order.get)
+        updates.append(','.join(map(str, update)))
+    return lines(rules) + '\n' + lines(updates)
+
+
+# The share of the map the route of the day 06 guard covers, a bit below the real input,
+# so its part 2 (an obstruction test per cell of the route) grows along with the map
+GUARD_ROUTE_SHARE = 0.2
+
+
+def guard_route(width: int, rng: random.Random) -> tuple[list[list[str]], set[tuple[int, int]]]:
+    # An outward spiral from the centre, with an obstacle at the end of every stretch. Every stretch is
+    # 2 to 4 cells longer than the one two before it (the previous lap on that side), so the guard never
+    # walks into its own route or an earlier obstacle and can't loop. Once the route is long enough,
+    # or the next lap doesn't fit, the guard walks straight off the map.
+    grid = [['.'] * width for _ in range(width)]
+    x = y = width // 2
+    dx, dy = 0, -1
+    route = {(x, y)}
+    lengths = [0, 0]
+    while len(route) < GUARD_ROUTE_SHARE * width * width:
+        length = lengths[-2] + rng.randint(2, 4)
+        obstacle_x, obstacle_y = x + dx * (length + 1), y + dy * (length + 1)
+        if not (0 <= obstacle_x < width and 0 <= obstacle_y < width):
+            break
+        for _ in range(length):
+            x, y = x + dx, y + dy
+            route.add((x, y))
+        grid[obstacle_y][obstacle_x] = '#'
+        dx, dy = -dy, dx
+        lengths.append(length)
+    while 0 <= x + dx < width and 0 <= y + dy < width:
+        x, y = x + dx, y + dy
+        route.add((x, y))
+    return grid, route
+
+
+@generator('06', 'cells')
+def generate_06(size: int, rng: random.Random) -> str:
+    width = side(size)
+    grid, route = guard_route(width, rng)
+    # more obstacles off the route, the guard never walks into those cells so they don't change the route
+    for y, row in enumerate(grid):
+        for x in range(width):
+            if row[x] == '.' and (x, y) not in route and rng.random() < 0.02:
+                row[x] = '#'
+    grid[width // 2][width // 2] = '^'
+    return lines(map(''.join, grid))
+
+
+@generator('07', 'equations')
+def generate_07(size: int, rng: random.Random) -> str:
+    equations = []
+    for _ in range(size):
+        values = [rng.randrange(1, 100) for _ in range(rng.randrange(3, 13))]
+        result = values[0]
+        for value in values[1:]:
+            match rng.randrange(3):
+                case 0:
+                    result += value
+                case 1:
+                    result *= value
+                case 2:
+                    result = int(f'{result}{value}')
+        if rng.random() < 0.5:
+            result += rng.randrange(1, 10)  # most likely unsolvable
+        equations.append(f'{result}: {" ".join(map(str, values))}')
+    return lines(equations)
+
+
+@generator('08', 'cells')
+def generate_08(size: int, rng: random.Random) -> str:
+    width = side(size)
+    grid = [['.'] * width for _ in range(width)]
+    frequencies = string.digits + string.ascii_letters
+    for _ in range(width * width // 16):
+        grid[rng.randrange(width)][rng.randrange(width)] = rng.choice(frequencies)
+    return lines(map(''.join, grid))
+
+
+@generator('09', 'digits')
+def generate_09(size: int, rng: random.Random) -> str:
+    # files are never empty, free space can be
+    digits = [str(rng.randrange(1, 10) if i % 2 == 0 else rng.randrange(10)) for i in range(size | 1)]
+    return ''.join(digits) + '\n'
+
+
+@generator('10', 'cells')
+def generate_10(size: int, rng: random.Random) -> str:
+    # diagonal slopes with some noise, fully random heights hardly contain any trails
+    width = side(size)
+    return lines(
+        ''.join(str(rng.randrange(10) if rng.random() < 0.3 else (x + y) % 10) for x in range(width))
+        for y in range(width)
+    )
+
+
+@generator('11', 'stones')
+def generate_11(size: int, rng: random.Random) -> str:
+    return ' '.join(str(rng.randrange(1_000_000)) for _ in range(size)) + '\n'
+
+
+@generator('12', 'cells')
+def generate_12(size: int, rng: random.Random) -> str:
+    # blocks of 5x5 plants, with ragged edges by copying the plant of a neighbour now and then
+    width = side(size)
+    blocks = [[rng.choice(string.ascii_uppercase) for _ in range(width // 5 + 1)] for _ in range(width // 5 + 1)]
+    grid = [[blocks[y // 5][x // 5] for x in range(width)] for y in range(width)]
+    for y in range(width):
+        for x in range(width):
+            if rng.random() < 0.3:
+                if x > 0 and (y == 0 or rng.random() < 0.5):
+                    grid[y][x] = grid[y][x - 1]
+                elif y > 0:
+                    grid[y][x] = grid[y - 1][x]
+    return lines(map(''.join, grid))
+
+
+@generator('13', 'machines')
+def generate_13(size: int, rng: random.Random) -> str:
+    machines = []
+    for _ in range(size):
+        ax, ay, bx, by = (rng.randrange(10, 100) for _ in range(4))
+        if rng.random() < 0.5:
+            a, b = rng.randrange(100), rng.randrange(100)
+            prize_x, prize_y = a * ax + b * bx, a * ay + b * by
+        else:
+            prize_x, prize_y = rng.randrange(1000, 20000), rng.randrange(1000, 20000)
+        machines.append(f'Button A: X+{ax}, Y+{ay}\nButton B: X+{bx}, Y+{by}\nPrize: X={prize_x}, Y={prize_y}\n')
+    return '\n'.join(machines)
+
+
+@generator('14', 'robots', args=lambda size: (101, 103))
+def generate_14(size: int, rng: random.Random) -> str:
+    return lines(
+        f'p={rng.randrange(101)},{rng.randrange(103)} v={rng.randrange(-100, 101)},{rng.randrange(-100, 101)}'
+        for _ in range(size)
+    )
+
+
+@generator('15', 'cells')
+def generate_15(size: int, rng: random.Random) -> str:
+    width = side(size, 6)
+    grid = [['#'] * width for _ in range(width)]
+    for y in range(1, width - 1):
+        for x in range(1, width - 1):
+            roll = rng.random()
+            grid[y][x] = '#' if roll < 0.05 else 'O' if roll < 0.3 else '.'
+    grid[rng.randrange(1, width - 1)][rng.randrange(1, width - 1)] = '@'
+    # about 8 moves per cell, like the 20.000 moves on the 50x50 map of the real input
+    moves = ''.join(rng.choices('<>^v', k=8 * width * width))
+    return lines(map(''.join, grid)) + '\n' + lines(moves[start:start + 1000] for start in range(0, len(moves), 1000))
+
+
+def maze(width: int, rng: random.Random, start: tuple[int, int]) -> tuple[list[list[str]], dict]:
+    # depth first maze on the odd coordinates, returns the grid and the parent of every cell in the spanning tree
+    grid = [['#'] * width for _ in range(width)]
+    grid[start[1]][start[0]] = '.'
+    parents = {start: None}
+    stack = [start]
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 < x + dx < width - 1 and 0 < y + dy < width - 1 and grid[y + dy][x + dx] == '#']
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        grid[(y + ny) // 2][(x + nx) // 2] = '.'
+        grid[ny][nx] = '.'
+        parents[(nx, ny)] = (x, y)
+        stack.append((nx, ny))
+    return grid, parents
+
+
+@generator('16', 'cells')
+def generate_16(size: int, rng: random.Random) -> str:
+    width = odd_side(size)
+    grid, _ = maze(width, rng, (1, width - 2))
+    # open some extra walls, so there are several (and several cheapest) paths
+    for _ in range(width * width // 20):
+        grid[rng.randrange(1, width - 1)][rng.randrange(1, width - 1)] = '.'
+    grid[width - 2][1] = 'S'
+    grid[1][width - 2] = 'E'
+    return lines(map(''.join, grid))
+
+
+@generator('17', 'output digits')
+def generate_17(size: int, rng: random.Random) -> str:
+    # the shape of the real programs: output a function of the lowest bits of A, shift A by 3, repeat until A is 0
+    register_a = rng.randrange(8 ** (size - 1), 8 ** size)
+    program = [2, 4, 1, rng.randrange(8), 7, 5, 1, rng.randrange(8), 4, rng.randrange(8), 5, 5, 0, 3, 3, 0]
+    return f'Register A: {register_a}\nRegister B: 0\nRegister C: 0\n\nProgram: {",".join(map(str, program))}\n'
+
+
+@generator('18', 'cells', args=lambda size: (side(size), side(size) ** 2 // 5))
+def generate_18(size: int, rng: random.Random) -> str:
+    width = side(size)
+    time = width * width // 5  # the bytes part 1 drops, as in args
+    start_neighbours = [(1, 0), (0, 1)]
+    excluded = {(0, 0), (width - 1, width - 1), *start_neighbours}
+    # a random staircase path from the start to the end, none of its bytes fall within the first time bytes
+    steps = [(1, 0)] * (width - 1) + [(0, 1)] * (width - 1)
+    rng.shuffle(steps)
+    x = y = 0
+    path = []
+    for dx, dy in steps:
+        x, y = x + dx, y + dy
+        if (x, y) not in excluded:
+            path.append((x, y))
+    on_path = set(path)
+    cells = [(x, y) for y in range(width) for x in range(width) if (x, y) not in excluded and (x, y) not in on_path]
+    rng.shuffle(cells)
+    later = cells[time:] + path
+    rng.shuffle(later)
+    count = (width * width - len(excluded)) * 2 // 3
+    # the neighbours of the start come last, so part 1 has a path and part 2 always finds a blocking byte
+    falling = cells[:time] + later[:count - time] + start_neighbours
+    return lines(f'{x},{y}' for x, y in falling)
+
+
+@generator('19', 'designs')
+def generate_19(size: int, rng: random.Random) -> str:
+    towels = set()
+    while len(towels) < 400:
+        towel = ''.join(rng.choices('wubrg', k=rng.randrange(1, 9)))
+        if towel != 'b':
+            towels.add(towel)  # without a single b, designs can be impossible
+    towels = sorted(towels)
+    designs = []
+    for _ in range(size):
+        if rng.random() < 0.5:
+            design = ''
+            while len(design) < 20:
+                design += rng.choice(towels)
+        else:
+            design = ''.join(rng.choices('wubrg', k=rng.randrange(20, 61)))
+        designs.append(design)
+    return ', '.join(towels) + '\n\n' + lines(designs)
+
+
+@generator('20', 'cells')
+def generate_20(size: int, rng: random.Random) -> str:
+    # the race track is the path between two corners of a maze, every other cell is a wall
+    width = odd_side(size)
+    start, end = (1, width - 2), (width - 2, 1)
+    _, parents = maze(width, rng, start)
+    grid = [['#'] * width for _ in range(width)]
+    cell = end
+    while parents[cell] is not None:
+        parent = parents[cell]
+        grid[cell[1]][cell[0]] = '.'
+        grid[(cell[1] + parent[1]) // 2][(cell[0] + parent[0]) // 2] = '.'
+        cell = parent
+    grid[start[1]][start[0]] = 'S'
+    grid[end[1]][end[0]] = 'E'
+    return lines(map(''.join, grid))
+
+
+@generator('21', 'codes')
+def generate_21(size: int, rng: random.Random) -> str:
+    return lines(f'{rng.randrange(1000):03}A' for _ in range(size))
+
+
+@generator('22', 'buyers')
+def generate_22(size: int, rng: random.Random) -> str:
+    return lines(str(rng.randrange(1, 1 << 24)) for _ in range(size))
+
+
+def computer_names(count: int) -> list[str]:
+    # two letters like the real input, three when there are more computers than that
+    length = 2 if count <= 26 ** 2 else 3
+    if count > 26 ** length:
+        raise ValueError(f'At most {26 ** 3} computers are supported')
+    return [''.join(letters) for letters in itertools.product(string.ascii_lowercase, repeat=length)]
+
+
+@generator('23', 'computers')
+def generate_23(size: int, rng: random.Random) -> str:
+    names = rng.sample(computer_names(size), max(size, 2))
+    connections = set()
+    # about 13 connections per computer and one party of 13, like the real input
+    for name in names:
+        for other in rng.sample(names, min(7, len(names))):
+            if other != name:
+                connections.add(tuple(sorted((name, other))))
+    party = rng.sample(names, min(13, len(names)))
+    for i, name in enumerate(party):
+        for other in party[i + 1:]:
+            connections.add(tuple(sorted((name, other))))
+    connections = [f'{a}-{b}' if rng.random() < 0.5 else f'{b}-{a}' for a, b in connections]
+    rng.shuffle(connections)
+    return lines(connections)
+
+
+@generator('24', 'bits')
+def generate_24(size: int, rng: random.Random) -> str:
+    # A ripple carry adder with the outputs of 4 pairs of gates swapped, each pair within the adder of a single bit
+    if not 2 <= size <= 99:
+        raise ValueError('The adder needs between 2 and 99 bits')
+    names = iter(rng.sample([''.join(letters) for letters in itertools.product(string.ascii_lowercase, repeat=3)
+                             if letters[0] not in 'xyz'], 5 * size))
+    gates = []
+    carry = None
+    swappable = []
+    for bit in range(size):
+        x, y, z = f'x{bit:02}', f'y{bit:02}', f'z{bit:02}'
+        if carry is None:
+            gates.append([x, 'XOR', y, z])
+            carry = next(names)
+            gates.append([x, 'AND', y, carry])
+            continue
+        half_sum, half_carry, carry_through, next_carry = next(names), next(names), next(names), next(names)
+        if bit == size - 1:
+            next_carry = f'z{size:02}'
+        adder = [[x, 'XOR', y, half_sum], [x, 'AND', y, half_carry], [half_sum, 'XOR', carry, z],
+                 [half_sum, 'AND', carry, carry_through], [half_carry, 'OR', carry_through, next_carry]]
+        gates.extend(adder)
+        if bit < size - 1:
+            swappable.append(adder)
+        carry = next_carry
+    # pairs (by position in the adder) that don't create a loop when their outputs are swapped
+    for adder in rng.sample(swappable, min(4, len(swappable))):
+        first, second = rng.choice(((0, 1), (2, 4), (2, 3), (2, 1)))
+        adder[first][3], adder[second][3] = adder[second][3], adder[first][3]
+    for gate in gates:
+        if rng.random() < 0.5:
+            gate[0], gate[2] = gate[2], gate[0]
+    rng.shuffle(gates)
+    wires = [f'{wire}{bit:02}: {rng.randrange(2)}' for wire in 'xy' for bit in range(size)]
+    return lines(wires) + '\n' + lines(f'{a} {operation} {b} -> {out}' for a, operation, b, out in gates)
+
+
+@generator('25', 'schematics')
+def generate_25(size: int, rng: random.Random) -> str:
+    schematics = []
+    for _ in range(size):
+        heights = [rng.randrange(6) for _ in range(5)]
+        rows = [''.join('#' if height >= row else '.' for height in heights) for row in range(1, 6)]
+        if rng.random() < 0.5:
+            schematics.append(lines(['#####', *rows, '.....']))
+        else:
+            schematics.append(lines(['.....', *reversed(rows), '#####']))
+    return '\n'.join(schematics)
+
+
+def generate(day: str, size: int, seed: int = 0) -> str:
+    # the seed is combined with the day and size, so every input gets its own random numbers
+    return GENERATORS[day].function(size, random.Random(f'{day}-{size}-{seed}'))
+
+
+def generated_file(day: str, size: int, seed: int = 0, directory: str = DEFAULT_DIRECTORY) -> str:
+    # Generating the bigger inputs takes a while, they're kept until the generators change
+    path = os.path.join(directory, f'seed{seed}', day, f'size{size}.txt')
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(__file__):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        text = generate(day, size, seed)
+        with open(path, 'w') as f:
+            f.write(text)
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Generate an input of any size for a day')
+    parser.add_argument('day', nargs='?', help='the day, e.g. 06')
+    parser.add_argument('size', nargs='?', type=int, help='size of the input, the unit depends on the day (see --list)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='write to this file instead of stdout')
+    parser.add_argument('--list', action='store_true', help='list the unit of the size of every day')
+    args = parser.parse_args(argv)
+    if args.list:
+        for day, gen in sorted(GENERATORS.items()):
+            print(f'{day}: {gen.unit}')
+        return
+    if args.day is None or args.size is None:
+        parser.error('the day and size are required')
+    text = generate(args.day.zfill(2), args.size, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import re
+from typing import Iterator
+
+# Cells are stored as bytes in a flat bytearray with a one cell border around the map.
+# The border holds OUTSIDE, so a neighbour of any cell on the map is always a valid index,
+# and bounds checks are a single comparison instead of checking x and y against the size.
+OUTSIDE = 0
+
+# Indexes into Grid.offsets4, clockwise, so turning right is (direction + 1) % 4
+NORTH = 0
+EAST = 1
+SOUTH = 2
+WEST = 3
+
+
+def stencil_variants(stencil: list[str]) -> list[tuple[str, ...]]:
+    # The distinct rotations and reflections of a stencil
+    if len(set(map(len, stencil))) > 1:
+        raise ValueError('All rows of a stencil must have the same length')
+    variants = []
+    rows = tuple(stencil)
+    for _ in range(4):
+        for variant in (rows, tuple(row[::-1] for row in rows)):
+            if variant not in variants:
+                variants.append(variant)
+        rows = tuple(''.join(column) for column in zip(*reversed(rows)))  # rotated clockwise
+    return variants
+
+
+class Grid:
+    width: int
+    height: int
+    stride: int
+    cells: bytearray
+    offsets4: tuple[int, int, int, int]
+    offsets8: tuple[int, int, int, int, int, int, int, int]
+
+    def __init__(self, width: int, height: int, fill: str = '.') -> None:
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.cells = bytearray(self.stride * (height + 2))
+        row = fill.encode() * width
+        for y in range(height):
+            start = self.index(0, y)
+            self.cells[start:start + width] = row
+        # north, east, south, west
+        self.offsets4 = (-self.stride, 1, self.stride, -1)
+        # north, north east, east, south east, south, south west, west, north west
+        self.offsets8 = (-self.stride, 1 - self.stride, 1, self.stride + 1,
+                         self.stride, self.stride - 1, -1, -self.stride - 1)
+
+    @classmethod
+    def from_lines(cls, lines: list[str]) -> "Grid":
+        grid = cls(max(map(len, lines), default=0), len(lines))
+        for y, line in enumerate(lines):
+            start = grid.index(0, y)
+            grid.cells[start:start + len(line)] = line.encode()
+        return grid
+
+    @classmethod
+    def from_file(cls, filename: str) -> "Grid":
+        lines = []
+        with open(filename) as f:
+            for line in f:
+                if not line.strip():
+                    break  # the map ends at the first blank line
+                lines.append(line.strip())
+        return cls.from_lines(lines)
+
+    def index(self, x: int, y: int) -> int:
+        return (y + 1) * self.stride + x + 1
+
+    def coords(self, index: int) -> tuple[int, int]:
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
+
+    def in_bounds(self, index: int) -> bool:
+        return self.cells[index] != OUTSIDE
+
+    def __getitem__(self, index: int) -> str:
+        return chr(self.cells[index])
+
+    def __setitem__(self, index: int, value: str) -> None:
+        self.cells[index] = ord(value)
+
+    def positions(self) -> Iterator[int]:
+        for y in range(self.height):
+            start = self.index(0, y)
+            yield from range(start, start + self.width)
+
+    def find(self, value: str) -> int:
+        index = self.cells.find(value.encode())
+        if index == -1:
+            raise ValueError(f'Could not find {value} in grid')
+        return index
+
+    def find_all(self, value: str) -> list[int]:
+        needle = value.encode()
+        indices = []
+        index = self.cells.find(needle)
+        while index != -1:
+            indices.append(index)
+            index = self.cells.find(needle, index + 1)
+        return indices
+
+    def lines(self, offset: int) -> Iterator[tuple[int, bytes]]:
+        # Every line through the grid in the direction of offset (one of offsets8 with a positive offset),
+        # as the index it starts at and its cells. The lines still contain border cells, which separate
+        # the parts of a diagonal that wrap around from one row to the next.
+        cells = bytes(self.cells)
+        for start in range(offset):
+            yield start, cells[start::offset]
+
+    def stencil_pattern(self, stencil: tuple[str, ...] | list[str], wildcard: str = '.') -> re.Pattern:
+        # Matches the cells of the stencil at the index of its top left corner. The rows are apart by
+        # the stride, a wildcard matches any cell on the map, which keeps the stencil from reaching
+        # into the border. The lookahead finds stencils that overlap.
+        width = len(stencil[0])
+        rows = [b''.join(b'[^\\x00]' if c == wildcard else re.escape(c.encode()) for c in row) for row in stencil]
+        gap = b'.{%d}' % (self.stride - width)
+        return re.compile(b'(?=%s)' % gap.join(rows), re.DOTALL)
+
+    def find_stencil(self, stencil: list[str], wildcard: str = '.', variants: bool = True) -> list[int]:
+        # The index of the top left corner of every match of the stencil, for every variant
+        # (rotations and reflections) of it that matches there
+        indices = []
+        for variant in stencil_variants(stencil) if variants else [tuple(stencil)]:
+            if len(variant) > self.height or len(variant[0]) > self.width:
+                continue
+            pattern = self.stencil_pattern(variant, wildcard)
+            indices.extend(match.start() for match in pattern.finditer(self.cells))
+        return indices
+
+    def neighbours(self, index: int) -> list[int]:
+        cells = self.cells
+        return [index + offset for offset in self.offsets4 if cells[index + offset] != OUTSIDE]
+
+    def neighbours8(self, index: int) -> list[int]:
+        cells = self.cells
+        return [index + offset for offset in self.offsets8 if cells[index + offset] != OUTSIDE]
+
+    def copy(self) -> "Grid":
+        grid = Grid.__new__(Grid)
+        grid.__dict__.update(self.__dict__)
+        grid.cells = bytearray(self.cells)
+        return grid
+
+    def __str__(self) -> str:
+        return '\n'.join(
+            self.cells[self.index(0, y):self.index(self.width, y)].decode()
+            for y in range(self.height)
+        )
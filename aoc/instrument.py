@@ -0,0 +1,162 @@
+import atexit
+import contextlib
+import functools
+import os
+import sys
+import time
+from collections import Counter
+from typing import Callable, TypeVar
+
+F = TypeVar('F', bound=Callable)
+
+# Instrumentation has to be enabled before the days are imported: when it is disabled, counted returns
+# the function itself and phase a shared no-op context manager, so there is nothing left to cost time.
+enabled = os.environ.get('AOC_INSTRUMENT', '') not in ('', '0')
+
+_NO_PHASE = contextlib.nullcontext()
+_stack: list[str] = []
+# total seconds per stack of phases, e.g. ('day06.part2', 'solve', 'parse')
+_timings: dict[tuple[str, ...], float] = {}
+_counts: Counter[str] = Counter()
+_caches: dict[str, Callable] = {}
+
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+
+def function_name(function: Callable) -> str:
+    return f'{function.__module__}.{function.__qualname__}'
+
+
+class _Phase:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        _stack.append(self.name)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        key = tuple(_stack)
+        _timings[key] = _timings.get(key, 0.0) + elapsed
+        _stack.pop()
+
+
+def phase(name: str) -> contextlib.AbstractContextManager:
+    if not enabled:
+        return _NO_PHASE
+    return _Phase(name)
+
+
+def counted(function: F, name: str | None = None) -> F:
+    if not enabled:
+        return function
+    key = name or function_name(function)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        _counts[key] += 1
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def track_cache(function: F) -> F:
+    # for functions wrapped in functools.cache, reports their cache_info
+    _caches[function_name(function)] = function
+    return function
+
+
+def collect() -> dict:
+    # Everything recorded so far, afterwards the recording starts over (which clears the tracked caches)
+    data = {
+        'phases': {';'.join(stack): seconds for stack, seconds in _timings.items()},
+        'counts': dict(_counts),
+        'caches': {},
+    }
+    for name, function in _caches.items():
+        info = function.cache_info()
+        if info.hits or info.misses:
+            data['caches'][name] = {'hits': info.hits, 'misses': info.misses}
+        function.cache_clear()
+    _timings.clear()
+    _counts.clear()
+    return data
+
+
+def merge(total: dict, data: dict) -> dict:
+    phases = total.setdefault('phases', {})
+    for stack, seconds in data['phases'].items():
+        phases[stack] = phases.get(stack, 0.0) + seconds
+    counts = total.setdefault('counts', {})
+    for name, count in data['counts'].items():
+        counts[name] = counts.get(name, 0) + count
+    caches = total.setdefault('caches', {})
+    for name, info in data['caches'].items():
+        known = caches.setdefault(name, {'hits': 0, 'misses': 0})
+        known['hits'] += info['hits']
+        known['misses'] += info['misses']
+    return total
+
+
+def cache_ratios(data: dict) -> dict[str, dict]:
+    ratios = {}
+    for name, info in data.get('caches', {}).items():
+        calls = info['hits'] + info['misses']
+        ratios[name] = {**info, 'calls': calls, 'hit_ratio': info['hits'] / calls if calls else None}
+    return ratios
+
+
+def folded_stacks(data: dict) -> list[str]:
+    # Collapsed stacks as read by flamegraph.pl and speedscope, in microseconds.
+    # Those expect the time spent in a stack itself, so the time of the child phases is subtracted.
+    phases = data.get('phases', {})
+    self_time = dict(phases)
+    for stack, seconds in phases.items():
+        parent, _, _ = stack.rpartition(';')
+        if parent in self_time:
+            self_time[parent] -= seconds
+    return [f'{stack} {round(seconds * 1e6)}' for stack, seconds in sorted(self_time.items()) if seconds > 0]
+
+
+def write_json(path: str, data: dict) -> None:
+    import json
+
+    with open(path, 'w') as f:
+        json.dump({**data, 'caches': cache_ratios(data)}, f, indent=2)
+
+
+def write_folded(path: str, data: dict) -> None:
+    with open(path, 'w') as f:
+        f.writelines(line + '\n' for line in folded_stacks(data))
+
+
+def print_report(data: dict, file=sys.stderr) -> None:
+    phases = data.get('phases', {})
+    if phases:
+        print('Phases:', file=file)
+        for stack, seconds in sorted(phases.items()):
+            print(f'  {stack:<50} {seconds * 1e3:10.1f}ms', file=file)
+    if data.get('counts'):
+        print('Calls:', file=file)
+        for name, count in sorted(data['counts'].items(), key=lambda item: -item[1]):
+            print(f'  {name:<50} {count:>12}', file=file)
+    ratios = cache_ratios(data)
+    if ratios:
+        print('Caches:', file=file)
+        for name, info in sorted(ratios.items()):
+            print(f'  {name:<50} {info["calls"]:>12} calls, {info["hit_ratio"]:.1%} hits', file=file)
+
+
+def _report_at_exit() -> None:
+    print_report(collect())
+
+
+if enabled:
+    # running a day directly with AOC_INSTRUMENT=1 prints what was recorded when it ends
+    atexit.register(_report_at_exit)
@@ -0,0 +1,17 @@
+from typing import Iterable, TypeVar
+
+T = TypeVar('T')
+
+# The benchmark turns the progress bars off, drawing them costs time and they'd end up between the results
+enabled = True
+
+
+def progress(iterable: Iterable[T], total: int | None = None) -> Iterable[T]:
+    # https://pypi.org/project/tqdm/ is optional
+    if not enabled:
+        return iterable
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        return iterable
+    return tqdm(iterable, total=total)
@@ -0,0 +1,115 @@
+import heapq
+import math
+from dataclasses import dataclass
+from itertools import count
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+
+from aoc import instrument
+
+State = TypeVar('State', bound=Hashable)
+
+
+@dataclass
+class SearchResult(Generic[State]):
+    cost: int
+    path: list[State]
+
+
+@dataclass
+class AllPathsResult(Generic[State]):
+    cost: int
+    goals: list[State]
+    # every state with all the states it can be reached from at its lowest cost
+    parents: dict[State, list[State]]
+
+    def states(self) -> set[State]:
+        # walk back from the goals through the predecessors, this visits every state on any cheapest path
+        seen = set(self.goals)
+        stack = list(self.goals)
+        while stack:
+            for parent in self.parents[stack.pop()]:
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return seen
+
+
+def no_heuristic(state) -> int:
+    return 0
+
+
+class AStarSolver(Generic[State]):
+    # neighbours returns (next state, cost of the step) pairs. The heuristic has to be admissible
+    # (never more than the real remaining cost), without one this is Dijkstra.
+    def __init__(self,
+                 neighbours: Callable[[State], Iterable[tuple[State, int]]],
+                 heuristic: Callable[[State], int] = no_heuristic) -> None:
+        # counts how many states get expanded
+        self.neighbours = instrument.counted(neighbours, 'AStarSolver.expand')
+        self.heuristic = heuristic
+
+    def solve(self, start: State, is_goal: Callable[[State], bool]) -> SearchResult[State]:
+        neighbours = self.neighbours
+        heuristic = self.heuristic
+        # the counter breaks ties, so states never have to be compared with each other
+        counter = count()
+        open_set = [(heuristic(start), next(counter), 0, start)]
+        best: dict[State, int] = {start: 0}
+        parents: dict[State, State | None] = {start: None}
+
+        while open_set:
+            _, _, cost, state = heapq.heappop(open_set)
+            if cost > best[state]:
+                continue  # already found a cheaper route to this state
+            if is_goal(state):
+                return SearchResult(cost, self.get_path(parents, state))
+            for next_state, step_cost in neighbours(state):
+                next_cost = cost + step_cost
+                if next_cost < best.get(next_state, math.inf):
+                    best[next_state] = next_cost
+                    parents[next_state] = state
+                    heapq.heappush(open_set, (next_cost + heuristic(next_state), next(counter), next_cost, next_state))
+        raise ValueError('No path found')
+
+    def solve_all(self, start: State, is_goal: Callable[[State], bool]) -> AllPathsResult[State]:
+        # Same search, but a state keeps every predecessor it can be reached from at its lowest cost,
+        # and it continues until everything that could still be as cheap as the first goal is expanded.
+        neighbours = self.neighbours
+        heuristic = self.heuristic
+        counter = count()
+        open_set = [(heuristic(start), next(counter), 0, start)]
+        best: dict[State, int] = {start: 0}
+        parents: dict[State, list[State]] = {start: []}
+        goals: list[State] = []
+        goal_cost = math.inf
+
+        while open_set:
+            estimate, _, cost, state = heapq.heappop(open_set)
+            if estimate > goal_cost:
+                break  # everything left is more expensive than the goal
+            if cost > best[state]:
+                continue
+            if is_goal(state):
+                goal_cost = cost
+                goals.append(state)
+                continue
+            for next_state, step_cost in neighbours(state):
+                next_cost = cost + step_cost
+                known_cost = best.get(next_state, math.inf)
+                if next_cost < known_cost:
+                    best[next_state] = next_cost
+                    parents[next_state] = [state]
+                    heapq.heappush(open_set, (next_cost + heuristic(next_state), next(counter), next_cost, next_state))
+                elif next_cost == known_cost:
+                    parents[next_state].append(state)
+        if not goals:
+            raise ValueError('No path found')
+        return AllPathsResult(goal_cost, goals, parents)
+
+    @staticmethod
+    def get_path(parents: dict[State, State | None], state: State) -> list[State]:
+        path = [state]
+        while (state := parents[state]) is not None:
+            path.append(state)
+        path.reverse()
+        return path